@@ -1,78 +1,1163 @@
 import sys
+import re
+import csv
 import json
 import sqlite3
 import random
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
+from PyQt5.QtNetwork import QAbstractSocket, QLocalServer, QLocalSocket
 import requests
 from gtts import gTTS
 import pygame
 import tempfile
 import os
+import time
+import unicodedata
+import threading
+import multiprocessing
+import heapq
+import itertools
+import math
+import zlib
+import hashlib
+import uuid
+import getpass
+from array import array
+import numpy as np
+from collections import deque
+from urllib.parse import quote
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('recorder', 'name', 'start')
+    
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+    
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self.recorder.events.append((self.name, self.start, end - self.start, threading.get_ident()))
+        return False
+
+
+class PerfRecorder:
+    # Timers and counters for the hot paths. Spans go into a fixed-size ring
+    # buffer; while disabled span() hands back a shared no-op context manager so
+    # instrumented code pays for one attribute check.
+    def __init__(self, capacity=20000):
+        self.enabled = False
+        self.events = deque(maxlen=capacity)
+        self.counters = {}
+        self.origin_ns = time.perf_counter_ns()
+    
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+    
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def clear(self):
+        self.events.clear()
+        self.counters.clear()
+    
+    def stats(self):
+        durations = {}
+        for name, _, duration, _ in list(self.events):
+            durations.setdefault(name, []).append(duration)
+        
+        stats = {}
+        for name, values in durations.items():
+            values.sort()
+            stats[name] = {
+                'count': len(values),
+                'p50': self._percentile(values, 50) / 1e6,
+                'p95': self._percentile(values, 95) / 1e6,
+                'p99': self._percentile(values, 99) / 1e6,
+                'max': values[-1] / 1e6,
+            }
+        return stats
+    
+    def _percentile(self, sorted_values, pct):
+        # Nearest-rank percentile
+        index = max(0, -(-len(sorted_values) * pct // 100) - 1)
+        return sorted_values[index]
+    
+    def dump_chrome_trace(self, filename):
+        # Chrome trace event format; open in chrome://tracing or ui.perfetto.dev
+        pid = os.getpid()
+        trace = []
+        last_ts = 0
+        for name, start, duration, tid in list(self.events):
+            ts = (start - self.origin_ns) / 1000
+            last_ts = max(last_ts, ts + duration / 1000)
+            trace.append({'name': name, 'cat': name.split('.')[0], 'ph': 'X',
+                          'ts': ts, 'dur': duration / 1000, 'pid': pid, 'tid': tid})
+        for name, value in self.counters.items():
+            trace.append({'name': name, 'ph': 'C', 'ts': last_ts, 'pid': pid, 'args': {'value': value}})
+        with open(filename, 'w') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+        return len(trace)
+
+
+perf = PerfRecorder()
+perf.enabled = os.environ.get('KISWAZI_PROFILE') == '1'
+
+
+# Apostrophe-like characters written in words such as ng'ombe, ngʼombe, ng’ombe.
+# Lookup keys drop them; the G2P reads them all as the ng' apostrophe.
+APOSTROPHE_CHARS = "'’‘ʼʻ`´"
+KEY_APOSTROPHES = dict.fromkeys(map(ord, APOSTROPHE_CHARS), None)
+
+
+def normalize_key(text):
+    # Lookup key for headwords: NFKC, casefold, accents and apostrophes removed,
+    # whitespace collapsed. "Café" -> "cafe", "Ng'ombe" -> "ngombe".
+    text = text or ''
+    if text.isascii():
+        return ' '.join(text.lower().translate(KEY_APOSTROPHES).split())
+    # Apostrophes go first: NFKC turns ´ into a space plus a combining accent.
+    # The second pass catches the ones NFKC produces, e.g. from a fullwidth '.
+    text = unicodedata.normalize('NFKC', text.translate(KEY_APOSTROPHES)).casefold()
+    text = ''.join(ch for ch in unicodedata.normalize('NFD', text) if not unicodedata.combining(ch))
+    return ' '.join(unicodedata.normalize('NFC', text).translate(KEY_APOSTROPHES).split())
+
+
+DEFAULT_DB_PATH = 'dictionary.db'
+
+
+def _migrate_base_schema(cursor):
+    # Words table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS words (
+            id INTEGER PRIMARY KEY,
+            word TEXT UNIQUE,
+            definition TEXT,
+            part_of_speech TEXT,
+            pronunciation TEXT,
+            etymology TEXT,
+            example TEXT,
+            synonyms TEXT,
+            antonyms TEXT
+        )
+    ''')
+    
+    # Search history kwa database
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_history (
+            id INTEGER PRIMARY KEY,
+            word TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Bookmarks///////////
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bookmarks (
+            id INTEGER PRIMARY KEY,
+            word TEXT UNIQUE,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Custom word lists
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS word_lists (
+            id INTEGER PRIMARY KEY,
+            list_name TEXT,
+            words TEXT,
+            created_date DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Settings
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+
+
+def _migrate_history_index(cursor):
+    # History tab sorts by timestamp on every refresh
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_search_history_timestamp ON search_history (timestamp)")
+
+
+def _migrate_dictionary_sources(cursor):
+    # Extra dictionaries searched alongside the main words table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS dictionary_sources (
+            id INTEGER PRIMARY KEY,
+            name TEXT,
+            path TEXT UNIQUE,
+            enabled INTEGER DEFAULT 1,
+            added_date DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _migrate_definition_fts(cursor):
+    # Full-text index over definitions and examples for ranked definition
+    # matches. Builds without FTS5 simply skip it and fall back to LIKE.
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS words_fts
+            USING fts5(definition, example, content='words', content_rowid='id')
+        ''')
+    except sqlite3.OperationalError:
+        return
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS words_fts_insert AFTER INSERT ON words BEGIN
+            INSERT INTO words_fts (rowid, definition, example) VALUES (new.id, new.definition, new.example);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS words_fts_delete AFTER DELETE ON words BEGIN
+            INSERT INTO words_fts (words_fts, rowid, definition, example)
+            VALUES ('delete', old.id, old.definition, old.example);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS words_fts_update AFTER UPDATE OF definition, example ON words BEGIN
+            INSERT INTO words_fts (words_fts, rowid, definition, example)
+            VALUES ('delete', old.id, old.definition, old.example);
+            INSERT INTO words_fts (rowid, definition, example) VALUES (new.id, new.definition, new.example);
+        END
+    ''')
+    cursor.execute("INSERT INTO words_fts (words_fts) VALUES ('rebuild')")
+
+
+def _migrate_quiz_tables(cursor):
+    # Distractor pools for multiple-choice quizzes and the answer log
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS quiz_pools (
+            pool_key TEXT,
+            slot INTEGER,
+            word_id INTEGER,
+            PRIMARY KEY (pool_key, slot)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS quiz_pool_sizes (
+            pool_key TEXT PRIMARY KEY,
+            size INTEGER
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS quiz_answers (
+            id INTEGER PRIMARY KEY,
+            session TEXT,
+            word_id INTEGER,
+            chosen_word_id INTEGER,
+            correct INTEGER,
+            elapsed_ms INTEGER,
+            answered_at DATETIME
+        )
+    ''')
+
+
+def _migrate_sync_log(cursor):
+    # Change log and per-row versions for syncing personal data between devices.
+    # History rows get a stable uid so the same entry is never imported twice.
+    cursor.execute("ALTER TABLE search_history ADD COLUMN uid TEXT")
+    cursor.execute("ALTER TABLE search_history ADD COLUMN lamport INTEGER DEFAULT 0")
+    cursor.execute("ALTER TABLE search_history ADD COLUMN device_id TEXT DEFAULT ''")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_search_history_uid ON search_history (uid)")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY,
+            lamport INTEGER,
+            device_id TEXT,
+            table_name TEXT,
+            row_key TEXT,
+            op TEXT,
+            payload TEXT,
+            UNIQUE (device_id, lamport)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_versions (
+            table_name TEXT,
+            row_key TEXT,
+            lamport INTEGER,
+            device_id TEXT,
+            PRIMARY KEY (table_name, row_key)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_peers (
+            peer TEXT PRIMARY KEY,
+            byte_offset INTEGER
+        )
+    ''')
+
+
+def _migrate_normalized_keys(cursor):
+    # Indexed lookup key so exact and prefix searches are range scans that
+    # ignore case, accents and apostrophes
+    cursor.execute("ALTER TABLE words ADD COLUMN norm_key TEXT")
+    cursor.connection.create_function('normalize_key', 1, normalize_key)
+    cursor.execute("UPDATE words SET norm_key = normalize_key(word)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_words_norm_key ON words (norm_key)")
+
+
+def _migrate_headword_grams(cursor):
+    # Posting lists for wildcard pattern search, filled in by HeadwordGramIndex
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS headword_grams (
+            gram TEXT PRIMARY KEY,
+            ids BLOB
+        )
+    ''')
+
+
+def _migrate_refold_acute_keys(cursor):
+    # Keys for words spelled with ´ were built before apostrophes were folded
+    # ahead of NFKC and came out as "ng ombe"; rebuild them, and the pattern
+    # index from scratch if any changed
+    cursor.connection.create_function('normalize_key', 1, normalize_key)
+    cursor.execute("UPDATE words SET norm_key = normalize_key(word) WHERE instr(word, '\u00b4') > 0")
+    if cursor.rowcount:
+        cursor.execute("DELETE FROM headword_grams")
+        cursor.execute("DELETE FROM settings WHERE key = ?", (HeadwordGramIndex.WATERMARK_KEY,))
+
+
+# Schema version N is reached by applying SCHEMA_MIGRATIONS[N - 1]. Only ever
+# append to this list; the applied version is kept in PRAGMA user_version.
+SCHEMA_MIGRATIONS = [
+    _migrate_base_schema,
+    _migrate_history_index,
+    _migrate_dictionary_sources,
+    _migrate_definition_fts,
+    _migrate_quiz_tables,
+    _migrate_sync_log,
+    _migrate_normalized_keys,
+    _migrate_headword_grams,
+    _migrate_refold_acute_keys,
+]
+
+
+class DatabaseMaintenance:
+    # Connection tuning: WAL lets readers run while a writer commits, and
+    # synchronous=NORMAL is durable in WAL mode apart from the last transaction
+    # on power loss. cache_size is negative so it is measured in KiB.
+    MMAP_SIZE = 256 * 1024 * 1024
+    PRAGMAS = [
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('cache_size', -32000),
+        ('mmap_size', MMAP_SIZE),
+        ('temp_store', 'MEMORY'),
+        ('busy_timeout', 5000),
+    ]
+    MAINTENANCE_INTERVAL = timedelta(days=7)
+    LAST_RUN_KEY = 'last_maintenance'
+    # Pages returned to the OS per incremental vacuum step
+    VACUUM_PAGES = 2000
+    # Rows sampled per index by ANALYZE, so it never reads a whole large table
+    ANALYSIS_LIMIT = 1000
+
+    def __init__(self, db):
+        self.db = db
+
+    def configure(self):
+        cursor = self.db.conn.cursor()
+        # auto_vacuum can only be switched for free before the first table exists
+        if cursor.execute("PRAGMA page_count").fetchone()[0] == 0:
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        for name, value in self.PRAGMAS:
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+    def schema_version(self):
+        return self.db.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self):
+        version = self.schema_version()
+        if version > len(SCHEMA_MIGRATIONS):
+            raise sqlite3.DatabaseError(
+                f"Database schema version {version} is newer than this application supports")
+        for target, migration in enumerate(SCHEMA_MIGRATIONS[version:], start=version + 1):
+            cursor = self.db.conn.cursor()
+            try:
+                cursor.execute("BEGIN")
+                migration(cursor)
+                # PRAGMA does not accept parameters; target is always an int
+                cursor.execute(f"PRAGMA user_version = {int(target)}")
+                self.db.conn.commit()
+            except Exception:
+                self.db.conn.rollback()
+                raise
+
+    def check_integrity(self):
+        # quick_check skips the index/table cross-check, which keeps the scheduled
+        # check fast on large databases while still catching corrupted pages
+        rows = self.db.conn.execute("PRAGMA quick_check").fetchall()
+        problems = [row[0] for row in rows]
+        return [] if problems == ['ok'] else problems
+
+    def is_due(self):
+        row = self.db.conn.execute("SELECT value FROM settings WHERE key = ?", (self.LAST_RUN_KEY,)).fetchone()
+        if not row:
+            return True
+        try:
+            last_run = datetime.fromisoformat(row[0])
+        except ValueError:
+            return True
+        return datetime.now() - last_run >= self.MAINTENANCE_INTERVAL
+
+    def run_scheduled(self, force=False):
+        if not force and not self.is_due():
+            return False
+        cursor = self.db.conn.cursor()
+        cursor.execute(f"PRAGMA analysis_limit = {self.ANALYSIS_LIMIT}")
+        cursor.execute("ANALYZE")
+        cursor.execute("PRAGMA optimize")
+        if cursor.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            cursor.execute(f"PRAGMA incremental_vacuum({self.VACUUM_PAGES})")
+            cursor.fetchall()
+        cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                       (self.LAST_RUN_KEY, datetime.now().isoformat(timespec='seconds')))
+        self.db.conn.commit()
+        return True
+
+    def optimize_on_close(self):
+        # Cheap; only re-analyzes tables whose statistics have gone stale
+        self.db.conn.execute("PRAGMA optimize")
+
+
+# Column order expected by WordCard (word_data[0..8])
+WORD_COLUMNS = "id, word, definition, part_of_speech, pronunciation, etymology, example, synonyms, antonyms"
+MAIN_SOURCE_NAME = "Main dictionary"
+
+
+class SearchRanker:
+    # Scores a candidate row against the query. Headword tiers dominate, so an
+    # exact headword always outranks a prefix match, which outranks a match at a
+    # word boundary, a plain substring and finally a definition hit. BM25 from a
+    # full-text index (when the source has one) orders rows within the
+    # definition tier.
+    EXACT = 100
+    PREFIX = 80
+    WORD_BOUNDARY = 60
+    SUBSTRING = 40
+    DEFINITION_WORD = 20
+    DEFINITION = 10
+    
+    def __init__(self, query):
+        # Headwords compare on their normalized keys, definitions on casefolded text
+        self.query = normalize_key(query)
+        self.boundary = re.compile(r'(?<!\w)' + re.escape(self.query))
+        self.text_query = query.casefold()
+        self.text_boundary = re.compile(r'(?<!\w)' + re.escape(self.text_query))
+    
+    def score(self, word, definition, bm25=None):
+        word = normalize_key(word)
+        if word == self.query:
+            return self.EXACT
+        if word.startswith(self.query):
+            # Shorter completions first: "run" -> "runs" before "runaway"
+            return self.PREFIX - min(len(word) - len(self.query), 10) / 10
+        if self.boundary.search(word):
+            return self.WORD_BOUNDARY
+        if self.query in word:
+            return self.SUBSTRING
+        
+        if bm25 is not None:
+            # bm25() is negative with better matches further below zero
+            relevance = -bm25
+            return self.DEFINITION + 9 * relevance / (1 + relevance)
+        definition = (definition or '').casefold()
+        if self.text_boundary.search(definition):
+            return self.DEFINITION_WORD
+        if self.text_query in definition:
+            return self.DEFINITION
+        return 0
+    
+    def top_k(self, rows, k, bm25_column=False):
+        # Bounded min-heap: memory stays O(k) however many rows match
+        heap = []
+        for row in rows:
+            bm25 = row[-1] if bm25_column else None
+            word_data = row[:-1] if bm25_column else row
+            score = self.score(word_data[1], word_data[2], bm25)
+            if not score:
+                continue
+            item = ((score, -len(word_data[1] or ''), -word_data[0]), word_data)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item[0] > heap[0][0]:
+                heapq.heapreplace(heap, item)
+        heap.sort(reverse=True, key=lambda item: item[0])
+        return heap
+
+
+def fts_query(text):
+    # Quote every token so user input cannot inject FTS5 query syntax
+    tokens = re.findall(r"\w+", text)
+    return ' '.join('"' + token + '"' for token in tokens)
+
+
+class ReverseIndex:
+    # Reverse lookup ("search by meaning") over definitions and examples.
+    # Features are hashed word unigrams plus a crudely stemmed form of each
+    # word (so "missing" also matches "miss"), weighted with
+    # TF-IDF and L2-normalised per entry, so a dot product is the cosine
+    # similarity. The matrix is stored column-wise (one posting list per hashed
+    # feature) in .npy files that are memory-mapped on load; a query only touches
+    # the postings of its own features and scores them with one bincount.
+    # Words added after the last build go into a small in-memory delta segment
+    # until it grows large enough to justify a rebuild.
+    DIMENSIONS = 1 << 20
+    STEM_WEIGHT = 0.5
+    SUFFIXES = ('ingly', 'edly', 'ness', 'ing', 'ies', 'ed', 'es', 'ly', 's')
+    REBUILD_RATIO = 0.1
+    STOPWORDS = frozenset(
+        "a an and are as at be by for from has in is it its of on or that the to was were with "
+        "ya wa na kwa la cha za katika ni"
+        .split())
+    FILES = ('ptr', 'docs', 'weights', 'word_ids', 'idf')
+    
+    def __init__(self, db, directory):
+        self.db = db
+        self.directory = directory
+        self.base = None
+        self.max_id = 0
+        self.delta_ids = []
+        self.delta_postings = {}
+    
+    # Feature extraction
+    
+    def features(self, text):
+        counts = {}
+        for token in re.findall(r"\w+", (text or '').lower()):
+            if token in self.STOPWORDS or token.isdigit():
+                continue
+            key = zlib.crc32(token.encode('utf-8')) % self.DIMENSIONS
+            counts[key] = counts.get(key, 0) + 1.0
+            stem = self._stem(token)
+            key = zlib.crc32(b'~' + stem.encode('utf-8')) % self.DIMENSIONS
+            counts[key] = counts.get(key, 0) + self.STEM_WEIGHT
+        return counts
+    
+    def _stem(self, token):
+        for suffix in self.SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+                token = token[:-len(suffix)]
+                break
+        # "missing" -> "miss" -> "mis", "runs" -> "run"; only needs to be consistent
+        if len(token) > 3 and token[-1] == token[-2]:
+            token = token[:-1]
+        return token
+    
+    def _document(self, definition, example):
+        return self.features(f"{definition or ''} {example or ''}")
+    
+    # Persistence
+    
+    def _path(self, name):
+        return os.path.join(self.directory, name + '.npy')
+    
+    def load(self):
+        meta_path = os.path.join(self.directory, 'meta.json')
+        if not os.path.exists(meta_path):
+            return False
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('dimensions') != self.DIMENSIONS:
+            return False
+        self.base = {name: np.load(self._path(name), mmap_mode='r') for name in self.FILES}
+        self.max_id = meta['max_id']
+        self.delta_ids = []
+        self.delta_postings = {}
+        return True
+    
+    def is_loaded(self):
+        return self.base is not None
+    
+    def build(self, progress_callback=None):
+        total = self.db.conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+        # array.array keeps the flat feature lists compact; a Python list of
+        # ints would need several times the memory on a large dictionary
+        word_ids = []
+        features = array('q')
+        doc_index = array('i')
+        tf = array('f')
+        rows = self.db.conn.execute("SELECT id, definition, example FROM words ORDER BY id")
+        for position, (word_id, definition, example) in enumerate(rows):
+            counts = self._document(definition, example)
+            word_ids.append(word_id)
+            features.extend(counts.keys())
+            tf.extend(counts.values())
+            doc_index.extend([position] * len(counts))
+            if progress_callback and position % 10000 == 0:
+                progress_callback(position, total)
+        
+        features = np.frombuffer(features, dtype=np.int64)
+        doc_index = np.frombuffer(doc_index, dtype=np.int32)
+        tf = 1.0 + np.log(np.frombuffer(tf, dtype=np.float32))
+        
+        df = np.bincount(features, minlength=self.DIMENSIONS)
+        idf = (np.log((len(word_ids) + 1) / (df + 1)) + 1).astype(np.float32)
+        weights = tf * idf[features]
+        norms = np.sqrt(np.bincount(doc_index, weights=weights * weights, minlength=len(word_ids)))
+        weights /= np.maximum(norms[doc_index], 1e-12)
+        
+        order = np.argsort(features, kind='stable')
+        ptr = np.zeros(self.DIMENSIONS + 1, dtype=np.int64)
+        np.cumsum(df, out=ptr[1:])
+        arrays = {
+            'ptr': ptr,
+            'docs': doc_index[order],
+            'weights': weights[order].astype(np.float16),
+            'word_ids': np.asarray(word_ids, dtype=np.int64),
+            'idf': idf,
+        }
+        
+        os.makedirs(self.directory, exist_ok=True)
+        for name, values in arrays.items():
+            np.save(self._path(name), values)
+        with open(os.path.join(self.directory, 'meta.json'), 'w') as f:
+            json.dump({'dimensions': self.DIMENSIONS, 'max_id': word_ids[-1] if word_ids else 0,
+                       'documents': len(word_ids)}, f)
+        self.load()
+    
+    # Incremental updates
+    
+    def refresh(self):
+        # Index rows added since the last build or refresh. Returns False when the
+        # delta has outgrown the base and a full rebuild is due.
+        if self.base is None:
+            return False
+        rows = self.db.conn.execute("SELECT id, definition, example FROM words WHERE id > ? ORDER BY id",
+                                 (self.max_id,)).fetchall()
+        if not rows:
+            return True
+        # Features unseen in the base already carry the highest idf
+        idf = self.base['idf']
+        for word_id, definition, example in rows:
+            position = len(self.delta_ids)
+            self.delta_ids.append(word_id)
+            vector = {key: (1.0 + math.log(count)) * float(idf[key]) for key, count in self._document(definition, example).items()}
+            norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+            for key, value in vector.items():
+                self.delta_postings.setdefault(key, []).append((position, value / norm))
+        self.max_id = rows[-1][0]
+        return len(self.delta_ids) <= self.REBUILD_RATIO * max(len(self.base['word_ids']), 1000)
+    
+    # Queries
+    
+    def query(self, text, k):
+        # Returns [(similarity, word_id)] for the k most similar entries
+        counts = self.features(text)
+        if self.base is None or not counts:
+            return []
+        idf = self.base['idf']
+        keys = np.fromiter(counts.keys(), dtype=np.int64)
+        query_weights = (1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32))) * idf[keys]
+        query_weights /= max(float(np.linalg.norm(query_weights)), 1e-12)
+        
+        ptr = self.base['ptr']
+        starts, ends = ptr[keys], ptr[keys + 1]
+        docs = np.concatenate([self.base['docs'][s:e] for s, e in zip(starts, ends)])
+        contributions = np.concatenate([
+            self.base['weights'][s:e].astype(np.float32) * w for s, e, w in zip(starts, ends, query_weights)
+        ])
+        document_count = len(self.base['word_ids'])
+        scores = np.bincount(docs, weights=contributions, minlength=document_count) if len(docs) else np.zeros(document_count)
+        
+        results = []
+        if document_count:
+            k_base = min(k, document_count)
+            top = np.argpartition(-scores, k_base - 1)[:k_base]
+            results = [(float(scores[i]), int(self.base['word_ids'][i])) for i in top if scores[i] > 0]
+        
+        if self.delta_ids:
+            delta_scores = {}
+            for key, weight in zip(keys.tolist(), query_weights.tolist()):
+                for position, value in self.delta_postings.get(key, ()):
+                    delta_scores[position] = delta_scores.get(position, 0.0) + value * weight
+            results.extend((score, self.delta_ids[position]) for position, score in delta_scores.items())
+        
+        results.sort(reverse=True)
+        return results[:k]
+
+
+class DictionarySource:
+    # One dictionary database opened read-only. Each source has its own
+    # connection and lock, so different sources can be queried from different
+    # threads at the same time while a single source is never used concurrently.
+    def __init__(self, name, path, enabled=True, source_id=None):
+        self.name = name
+        self.path = path
+        self.enabled = enabled
+        self.source_id = source_id
+        self.error = None
+        self.has_fts = False
+        self.has_norm_key = False
+        self._conn = None
+        self._lock = threading.Lock()
+    
+    def _connect(self):
+        if self._conn is None:
+            uri = 'file:' + quote(os.path.abspath(self.path)) + '?mode=ro'
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._conn.execute("PRAGMA query_only = 1")
+            self._conn.execute(f"PRAGMA mmap_size = {DatabaseMaintenance.MMAP_SIZE}")
+            self.has_fts = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'words_fts'").fetchone() is not None
+            # Dictionaries from older versions or other tools may lack the key column
+            self.has_norm_key = any(row[1] == 'norm_key' for row in self._conn.execute("PRAGMA table_info(words)"))
+        return self._conn
+    
+    def validate(self):
+        with self._lock:
+            conn = self._connect()
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(words)")}
+        missing = {c.strip() for c in WORD_COLUMNS.split(',')} - columns
+        if missing:
+            raise sqlite3.DatabaseError(f"Not a dictionary database (missing {', '.join(sorted(missing))})")
+    
+    def search(self, query, limit):
+        # Returns up to `limit` (rank, row) pairs, best first
+        ranker = SearchRanker(query)
+        with self._lock, perf.span('search.source'):
+            conn = self._connect()
+            headword_column, pattern = 'word', f"%{query}%"
+            if self.has_norm_key and ranker.query:
+                # Exact and prefix matches are one range scan on the key index,
+                # shortest first as the ranker orders them. They outrank every
+                # other tier, so a full page of them is final.
+                rows = conn.execute(f"""
+                    SELECT {WORD_COLUMNS} FROM words WHERE norm_key >= ? AND norm_key < ?
+                    ORDER BY length(norm_key), id LIMIT ?
+                """, (ranker.query, ranker.query + '\U0010ffff', limit))
+                top = ranker.top_k(rows, limit)
+                if len(top) >= limit:
+                    return top
+                headword_column, pattern = 'norm_key', f"%{ranker.query}%"
+            
+            match = fts_query(query) if self.has_fts else ''
+            if match:
+                # Definition hits come from the full-text index with their BM25
+                # score instead of a LIKE scan over every definition
+                rows = conn.execute(f"""
+                    SELECT {WORD_COLUMNS}, fts.rank FROM words
+                    LEFT JOIN (SELECT rowid, bm25(words_fts) AS rank FROM words_fts WHERE words_fts MATCH ?) AS fts
+                        ON fts.rowid = words.id
+                    WHERE {headword_column} LIKE ? OR fts.rowid IS NOT NULL
+                """, (match, pattern))
+                return ranker.top_k(rows, limit, bm25_column=True)
+            rows = conn.execute(f"SELECT {WORD_COLUMNS} FROM words WHERE {headword_column} LIKE ? OR definition LIKE ?",
+                                (pattern, f"%{query}%"))
+            return ranker.top_k(rows, limit)
+    
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class DictionaryFederation:
+    # Fans a query out to every enabled dictionary on a thread pool and merges the
+    # per-source results into one global top-k. sqlite3 releases the GIL while a
+    # statement runs, so the total latency follows the slowest source.
+    MAIN_ENABLED_KEY = 'main_source_enabled'
+    
+    def __init__(self, db):
+        self.db = db
+        self.sources = []
+        self._executor = None
+        self.reload()
+    
+    def reload(self):
+        self.close()
+        settings = dict(self.db.conn.execute("SELECT key, value FROM settings WHERE key = ?",
+                                             (self.MAIN_ENABLED_KEY,)).fetchall())
+        self.sources = [DictionarySource(MAIN_SOURCE_NAME, self.db.db_path,
+                                         settings.get(self.MAIN_ENABLED_KEY) != 'false')]
+        for source_id, name, path, enabled in self.db.conn.execute(
+                "SELECT id, name, path, enabled FROM dictionary_sources ORDER BY id"):
+            self.sources.append(DictionarySource(name, path, bool(enabled), source_id))
+    
+    def add_source(self, name, path):
+        source = DictionarySource(name, path)
+        try:
+            source.validate()
+        finally:
+            source.close()
+        cursor = self.db.conn.cursor()
+        cursor.execute("INSERT INTO dictionary_sources (name, path) VALUES (?, ?)", (name, path))
+        self.db.conn.commit()
+        source.source_id = cursor.lastrowid
+        self.sources.append(source)
+        return source
+    
+    def remove_source(self, source):
+        if source.source_id is None:
+            raise ValueError("The main dictionary cannot be removed")
+        source.close()
+        self.sources.remove(source)
+        self.db.conn.execute("DELETE FROM dictionary_sources WHERE id = ?", (source.source_id,))
+        self.db.conn.commit()
+    
+    def set_enabled(self, source, enabled):
+        source.enabled = enabled
+        if source.source_id is None:
+            self.db.conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                                 (self.MAIN_ENABLED_KEY, 'true' if enabled else 'false'))
+        else:
+            self.db.conn.execute("UPDATE dictionary_sources SET enabled = ? WHERE id = ?",
+                                 (int(enabled), source.source_id))
+        self.db.conn.commit()
+    
+    def enabled_sources(self):
+        return [source for source in self.sources if source.enabled]
+    
+    def main_source(self):
+        return self.sources[0]
+    
+    def search(self, query, limit, offset=0):
+        # Returns the (rank, source_name, row) tuples ranked offset..offset+limit.
+        # Every page re-selects the global top offset+limit, which stays cheap
+        # because each source only keeps that many rows in its heap.
+        limit += offset
+        sources = self.enabled_sources()
+        if not sources:
+            return []
+        if len(sources) == 1:
+            batches = [self._search_source(sources[0], query, limit)]
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='dict-source')
+            futures = [self._executor.submit(self._search_source, source, query, limit) for source in sources]
+            batches = [future.result() for future in futures]
+        
+        merged = (
+            (score, -order, source.name, row)
+            for order, (source, batch) in enumerate(zip(sources, batches))
+            for score, row in batch
+        )
+        # Ties keep the registration order of the sources
+        top = heapq.nlargest(limit, merged, key=lambda r: r[:2])
+        return [(score, name, row) for score, _, name, row in top[offset:]]
+    
+    def _search_source(self, source, query, limit):
+        try:
+            results = source.search(query, limit)
+            source.error = None
+            return results
+        except sqlite3.Error as e:
+            source.error = str(e)
+            source.close()
+            return []
+    
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        for source in self.sources:
+            source.close()
+
+
+class PatternQuery:
+    # Crossword-style patterns over normalized headwords: "?" is one letter,
+    # "*" any run of letters, [abc] / [a-e] / [^abc] a character class.
+    # "k?t?b*" finds kitabu, "??ana" finds five-letter words ending in -ana.
+    def __init__(self, pattern):
+        # Literals are folded the same way as norm_key; ?, *, [, ] and ^ survive
+        self.pattern = normalize_key(pattern)
+        self.tokens = self._parse(self.pattern)
+        self.regex = re.compile(''.join(regex for _, regex in self.tokens))
+        self.has_star = any(kind == '*' for kind, _ in self.tokens)
+        # Minimum length, and the exact length when there is no "*"
+        self.length = sum(1 for kind, _ in self.tokens if kind != '*')
+    
+    def _parse(self, pattern):
+        tokens = []
+        i = 0
+        while i < len(pattern):
+            ch = pattern[i]
+            if ch == '?':
+                tokens.append(('?', '.'))
+            elif ch == '*':
+                if not tokens or tokens[-1][0] != '*':
+                    tokens.append(('*', '.*'))
+            elif ch == '[' and ']' in pattern[i + 2:]:
+                end = pattern.index(']', i + 2)
+                body = pattern[i + 1:end]
+                negate = body.startswith('^')
+                if negate:
+                    body = body[1:]
+                escaped = ''.join('\\' + c if c in '\\]^' else c for c in body)
+                tokens.append(('[', '[' + ('^' if negate else '') + escaped + ']'))
+                i = end
+            else:
+                tokens.append((ch, re.escape(ch)))
+            i += 1
+        return tokens
+    
+    def literal_runs(self):
+        # Runs of literal characters, with ^ / $ marking runs anchored at the
+        # start or end of the word
+        runs = []
+        current = '^'
+        for kind, _ in self.tokens:
+            if kind in ('?', '*', '['):
+                runs.append(current)
+                current = ''
+            else:
+                current += kind
+        runs.append(current + '$')
+        return [run for run in runs if run not in ('^', '$', '')]
+    
+    def grams(self):
+        # Index grams every match must contain: trigrams of the literal runs,
+        # the letters at fixed offsets from either end, and the length when
+        # there is no "*"
+        grams = set()
+        for run in self.literal_runs():
+            for i in range(len(run) - 2):
+                grams.add(run[i:i + 3])
+        kinds = [kind for kind, _ in self.tokens]
+        head = kinds[:kinds.index('*')] if self.has_star else kinds
+        tail = kinds[len(kinds) - kinds[::-1].index('*'):] if self.has_star else []
+        for offset, kind in enumerate(head[:HeadwordGramIndex.MAX_OFFSET]):
+            if kind not in ('?', '['):
+                grams.add(HeadwordGramIndex.head_gram(offset, kind))
+        for offset, kind in enumerate(tail[::-1][:HeadwordGramIndex.MAX_OFFSET]):
+            if kind not in ('?', '['):
+                grams.add(HeadwordGramIndex.tail_gram(offset, kind))
+        if not self.has_star:
+            grams.add(HeadwordGramIndex.length_gram(self.length))
+        return grams
+    
+    def matches(self, key):
+        return self.regex.fullmatch(key or '') is not None
+
+
+class HeadwordGramIndex:
+    # Gram index over words.norm_key. Grams are the trigrams of "^key$", the
+    # letters at the first and last MAX_OFFSET offsets and the key length;
+    # trigrams are exactly three characters and the other grams never are, so
+    # they share one table. Each gram keeps its word ids as one sorted int32
+    # blob, so narrowing a pattern down is a handful of primary-key reads and
+    # numpy intersections. New words are appended incrementally; deleted ones
+    # are weeded out during verification.
+    WATERMARK_KEY = 'gram_index_max_id'
+    MAX_OFFSET = 8
+    
+    @staticmethod
+    def head_gram(offset, char):
+        return f"@{offset:02d}{char}"
+    
+    @staticmethod
+    def tail_gram(offset, char):
+        return f"${offset:02d}{char}"
+    
+    @staticmethod
+    def length_gram(length):
+        return f"#{length:04d}"
+    
+    def word_grams(self, key):
+        padded = f"^{key}$"
+        grams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+        for offset, char in enumerate(key[:self.MAX_OFFSET]):
+            grams.add(self.head_gram(offset, char))
+        for offset, char in enumerate(key[::-1][:self.MAX_OFFSET]):
+            grams.add(self.tail_gram(offset, char))
+        grams.add(self.length_gram(len(key)))
+        return grams
+    
+    def __init__(self, db):
+        self.db = db
+    
+    def _indexed_up_to(self):
+        row = self.db.conn.execute("SELECT value FROM settings WHERE key = ?", (self.WATERMARK_KEY,)).fetchone()
+        return int(row[0]) if row else 0
+    
+    def pending(self):
+        return self.db.conn.execute("SELECT COUNT(*) FROM words WHERE id > ?", (self._indexed_up_to(),)).fetchone()[0]
+    
+    def update(self, progress_callback=None):
+        last_id = self._indexed_up_to()
+        postings = {}
+        rows = self.db.conn.execute("SELECT id, norm_key FROM words WHERE id > ? ORDER BY id", (last_id,))
+        for count, (word_id, key) in enumerate(rows, start=1):
+            for gram in self.word_grams(key or ''):
+                ids = postings.get(gram)
+                if ids is None:
+                    ids = postings[gram] = array('i')
+                ids.append(word_id)
+            last_id = word_id
+            if progress_callback and count % 50000 == 0:
+                progress_callback(count)
+        if not postings:
+            return 0
+        
+        # Ids only grow, so appending keeps every posting list sorted
+        cursor = self.db.conn.cursor()
+        grams = list(postings)
+        for start in range(0, len(grams), 500):
+            batch = grams[start:start + 500]
+            existing = dict(cursor.execute(
+                f"SELECT gram, ids FROM headword_grams WHERE gram IN ({','.join('?' * len(batch))})", batch))
+            cursor.executemany("INSERT OR REPLACE INTO headword_grams (gram, ids) VALUES (?, ?)",
+                               ((gram, existing.get(gram, b'') + postings[gram].tobytes()) for gram in batch))
+        cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                       (self.WATERMARK_KEY, str(last_id)))
+        self.db.conn.commit()
+        return len(postings)
+    
+    def candidates(self, grams):
+        # Sorted ids of words containing every gram
+        grams = list(grams)
+        found = {}
+        for start in range(0, len(grams), 500):
+            batch = grams[start:start + 500]
+            found.update(self.db.conn.execute(
+                f"SELECT gram, ids FROM headword_grams WHERE gram IN ({','.join('?' * len(batch))})", batch))
+        if len(found) < len(grams):
+            return np.empty(0, dtype=np.int32)
+        lists = sorted((np.frombuffer(ids, dtype=np.int32) for ids in found.values()), key=len)
+        result = lists[0]
+        for ids in lists[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, ids, assume_unique=True)
+        return result
+
+
+class PatternSearch:
+    # Streams the headwords matching a pattern a page at a time. Candidates come
+    # from the gram index, or from a table scan for patterns without a single
+    # usable gram; each is verified against the compiled pattern.
+    BATCH = 500
+    
+    def __init__(self, db, pattern):
+        self.db = db
+        self.query = PatternQuery(pattern)
+        self._rows = self._matches()
+        self._lookahead = []
+    
+    def _candidate_batches(self):
+        query = self.query
+        grams = query.grams()
+        if grams:
+            ids = self.db.gram_index.candidates(grams).tolist()
+            # CROSS JOIN pins the plan to one rowid lookup per candidate, in id
+            # order; an IN list can be planned as a scan when the statistics
+            # predate a large import
+            columns = ', '.join('w.' + column for column in WORD_COLUMNS.split(', '))
+            for start in range(0, len(ids), self.BATCH):
+                yield self.db.conn.execute(f"""
+                    SELECT {columns}, w.norm_key FROM json_each(?) AS c
+                    CROSS JOIN words AS w ON w.id = c.value
+                """, (json.dumps(ids[start:start + self.BATCH]),)).fetchall()
+            return
+        
+        # Only patterns like "*a*" get here. Walk the table in keyset batches,
+        # so no statement is left open on the connection between pages
+        last_id = 0
+        while True:
+            rows = self.db.conn.execute(f"""
+                SELECT {WORD_COLUMNS}, norm_key FROM words
+                WHERE id > ? AND length(norm_key) >= ? ORDER BY id LIMIT ?
+            """, (last_id, query.length, self.BATCH)).fetchall()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
+    
+    def _matches(self):
+        for rows in self._candidate_batches():
+            for row in rows:
+                if self.query.matches(row[-1]):
+                    yield row[:-1]
+    
+    def next_page(self, size):
+        # Returns (rows, has_more)
+        with perf.span('search.pattern_page'):
+            rows = self._lookahead
+            rows.extend(itertools.islice(self._rows, size + 1 - len(rows)))
+            page, self._lookahead = rows[:size], rows[size:]
+        return page, bool(self._lookahead)
+
+
+class ConnectionManager:
+    # Hands out one connection per thread. sqlite3 connections must not be
+    # shared between threads, and with WAL each thread's connection can read
+    # while another writes. Every connection gets the tuned per-connection
+    # PRAGMAs; journal_mode=WAL is stored in the database file itself.
+    # Connections keep sqlite3's same-thread check, so each thread closes its
+    # own with release().
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+    
+    def get(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            for name, value in DatabaseMaintenance.PRAGMAS:
+                if name != 'journal_mode':
+                    conn.execute(f"PRAGMA {name} = {value}")
+            self._local.conn = conn
+        return conn
+    
+    def release(self):
+        # Background threads call this when they finish; the main thread's
+        # connection is released by DatabaseManager.close()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
 
 class DatabaseManager:
-    def __init__(self):
-        self.conn = sqlite3.connect('dictionary.db')
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.environ.get('KISWAZI_DB') or DEFAULT_DB_PATH
+        self.connections = ConnectionManager(self.db_path)
+        self.maintenance = DatabaseMaintenance(self)
+        self.maintenance.configure()
+        # Filled in by run_maintenance(), which the window runs on a worker thread
+        self.integrity_problems = []
         self.create_tables()
         self.populate_sample_data()
+        self.federation = DictionaryFederation(self)
+        self.reverse_index = ReverseIndex(self, self.db_path + '.revidx')
+        self.gram_index = HeadwordGramIndex(self)
+        self.sync = SyncManager(self)
+    
+    @property
+    def conn(self):
+        # The calling thread's own connection
+        return self.connections.get()
     
     def create_tables(self):
-        cursor = self.conn.cursor()
-        
-        # Words table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS words (
-                id INTEGER PRIMARY KEY,
-                word TEXT UNIQUE,
-                definition TEXT,
-                part_of_speech TEXT,
-                pronunciation TEXT,
-                etymology TEXT,
-                example TEXT,
-                synonyms TEXT,
-                antonyms TEXT
-            )
-        ''')
-        
-        # Search history kwa database
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS search_history (
-                id INTEGER PRIMARY KEY,
-                word TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Bookmarks///////////
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS bookmarks (
-                id INTEGER PRIMARY KEY,
-                word TEXT UNIQUE,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Custom word lists
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS word_lists (
-                id INTEGER PRIMARY KEY,
-                list_name TEXT,
-                words TEXT,
-                created_date DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Settings
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT
-            )
-        ''')
-        
-        self.conn.commit()
+        self.maintenance.migrate()
     
     def populate_sample_data(self):
         cursor = self.conn.cursor()
@@ -87,16 +1172,853 @@ class DatabaseManager:
             ]
             
             cursor.executemany('''
-                INSERT INTO words (word, definition, part_of_speech, pronunciation, etymology, example, synonyms, antonyms)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', sample_words)
+                INSERT INTO words (word, definition, part_of_speech, pronunciation, etymology, example, synonyms, antonyms, norm_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [row + (normalize_key(row[0]),) for row in sample_words])
             self.conn.commit()
+    
+    # Personal data; every write goes through the sync change log
+    
+    def add_history(self, word, timestamp=None):
+        self.sync.record('search_history', None, 'insert', {'word': word, 'timestamp': timestamp})
+        self.conn.commit()
+    
+    def clear_history(self):
+        self.sync.record('search_history', '*', 'clear')
+        self.conn.commit()
+    
+    def is_bookmarked(self, word):
+        return self.conn.execute("SELECT 1 FROM bookmarks WHERE word = ?", (word,)).fetchone() is not None
+    
+    def add_bookmark(self, word, timestamp=None):
+        self.sync.record('bookmarks', word, 'upsert', {'timestamp': timestamp})
+        self.conn.commit()
+    
+    def remove_bookmark(self, word):
+        self.sync.record('bookmarks', word, 'delete')
+        self.conn.commit()
+    
+    def save_word_list(self, name, words, created_date=None):
+        self.sync.record('word_lists', name, 'upsert', {'words': words, 'created_date': created_date})
+        self.conn.commit()
+    
+    def import_words(self, rows):
+        # rows are (word, definition, part_of_speech, pronunciation, etymology,
+        # example, synonyms, antonyms); existing headwords are left untouched
+        cursor = self.conn.cursor()
+        cursor.executemany('''
+            INSERT OR IGNORE INTO words (word, definition, part_of_speech, pronunciation, etymology, example, synonyms, antonyms, norm_key)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (tuple(row) + (normalize_key(row[0]),) for row in rows))
+        # rowcount leaves out rows written by the full-text index triggers
+        imported = cursor.rowcount
+        self.conn.commit()
+        if imported and self.reverse_index.is_loaded() and not self.reverse_index.refresh():
+            # Delta segment too large; rebuilt on the next meaning search
+            self.reverse_index.base = None
+        return imported
+    
+    def reverse_search(self, query, limit, offset=0):
+        # Meaning search over the main dictionary; returns rows in the same
+        # (rank, source_name, row) shape as DictionaryFederation.search
+        if not self.reverse_index.is_loaded() and not self.reverse_index.load():
+            return None
+        if not self.reverse_index.refresh():
+            return None
+        with perf.span('search.reverse'):
+            matches = self.reverse_index.query(query, offset + limit)[offset:]
+        if not matches:
+            return []
+        ids = [word_id for _, word_id in matches]
+        rows = {row[0]: row for row in self.conn.execute(
+            f"SELECT {WORD_COLUMNS} FROM words WHERE id IN ({','.join('?' * len(ids))})", ids)}
+        # Entries deleted since the index was built are skipped
+        return [(score, MAIN_SOURCE_NAME, rows[word_id]) for score, word_id in matches if word_id in rows]
+    
+    def pattern_search(self, pattern):
+        # Wildcard search over the main dictionary; words added since the last
+        # pattern search are indexed first
+        with perf.span('search.pattern_index'):
+            self.gram_index.update()
+        return PatternSearch(self, pattern)
+    
+    def run_maintenance(self):
+        # Meant for a worker thread, which gets its own connection. The
+        # integrity check runs every time; the scheduled pass only when it is
+        # due and the check passed, so a damaged database is neither analyzed
+        # nor marked as maintained. Returns the quick_check problems.
+        self.integrity_problems = self.maintenance.check_integrity()
+        if not self.integrity_problems:
+            self.maintenance.run_scheduled()
+        return self.integrity_problems
+    
+    def close(self):
+        self.federation.close()
+        self.maintenance.optimize_on_close()
+        self.connections.release()
+
+class SwahiliG2P:
+    # Swahili spelling is close to phonemic, so a longest-match grapheme table
+    # plus open-syllable rules and penultimate stress covers almost every word.
+    APOSTROPHES = APOSTROPHE_CHARS
+
+    GRAPHEMES = {
+        "ng'": 'ŋ',
+        'ng': 'ᵑɡ', 'ny': 'ɲ', 'ch': 'tʃ', 'sh': 'ʃ', 'th': 'θ', 'dh': 'ð',
+        'gh': 'ɣ', 'kh': 'x', 'mb': 'ᵐb', 'mv': 'ᶬv', 'nd': 'ⁿd', 'nj': 'ⁿdʒ',
+        'nz': 'ⁿz',
+        'a': 'ɑ', 'e': 'ɛ', 'i': 'i', 'o': 'ɔ', 'u': 'u',
+        'b': 'b', 'c': 'tʃ', 'd': 'd', 'f': 'f', 'g': 'ɡ', 'h': 'h', 'j': 'dʒ',
+        'k': 'k', 'l': 'l', 'm': 'm', 'n': 'n', 'p': 'p', 'q': 'k', 'r': 'r',
+        's': 's', 't': 't', 'v': 'v', 'w': 'w', 'x': 'ks', 'y': 'j', 'z': 'z',
+    }
+    VOWELS = set('aeiou')
+    # A nasal before one of these letters starts a syllable instead of forming one
+    NASAL_ONSET_FOLLOWERS = set('aeiouwy')
+
+    def transcribe(self, text):
+        words = [self.transcribe_word(part) for part in re.split(r"[\s\-]+", text or '')]
+        words = [w for w in words if w]
+        if not words:
+            return ''
+        return '/' + ' '.join(words) + '/'
+
+    def transcribe_word(self, word):
+        word = word.lower()
+        for mark in self.APOSTROPHES:
+            word = word.replace(mark, "'")
+        units = self._segment(word)
+        if not any(kind == 'V' for _, kind in units):
+            return ''
+        syllables = self._syllabify(units)
+        if len(syllables) >= 2:
+            syllables[-2] = 'ˈ' + syllables[-2]
+        return ''.join(syllables)
+
+    def _segment(self, word):
+        # Returns (ipa, kind) units where kind is V (vowel), C or N (syllabic nasal)
+        units = []
+        i = 0
+        while i < len(word):
+            for size in (3, 2, 1):
+                chunk = word[i:i + size]
+                if len(chunk) == size and chunk in self.GRAPHEMES:
+                    break
+            else:
+                i += 1  # punctuation and letters outside the Swahili alphabet
+                continue
+            ipa = self.GRAPHEMES[chunk]
+            if chunk in self.VOWELS:
+                kind = 'V'
+            elif chunk in ('m', 'n') and i + 1 < len(word) and word[i + 1] not in self.NASAL_ONSET_FOLLOWERS:
+                # mtu, nchi: the nasal carries its own syllable
+                ipa, kind = ipa + '̩', 'N'
+            else:
+                kind = 'C'
+            units.append((ipa, kind))
+            i += size
+        return units
+
+    def _syllabify(self, units):
+        syllables = []
+        onset = ''
+        for ipa, kind in units:
+            if kind == 'C':
+                onset += ipa
+            else:
+                syllables.append(onset + ipa)
+                onset = ''
+        if onset:
+            # Loanwords may end in a consonant; keep it in the final syllable
+            if syllables:
+                syllables[-1] += onset
+            else:
+                syllables.append(onset)
+        return syllables
+
+
+def _transcribe_chunk(rows):
+    # Process pool entry point; must stay at module level so it can be pickled
+    g2p = SwahiliG2P()
+    updates = []
+    for word_id, word in rows:
+        ipa = g2p.transcribe(word)
+        if ipa:
+            updates.append((ipa, word_id))
+    return rows[-1][0], len(rows), updates
+
+
+class PronunciationEnricher:
+    # Fills words.pronunciation for rows that have none. Progress is tracked by a
+    # row id watermark in the settings table so an interrupted run resumes where it
+    # stopped, and every UPDATE re-checks that the column is still empty so running
+    # the job twice never overwrites existing pronunciations.
+    WATERMARK_KEY = 'g2p_last_id'
+
+    def __init__(self, db_path, chunk_size=5000, workers=None):
+        self.db_path = db_path
+        self.chunk_size = chunk_size
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.cancelled = False
+
+    def pending_count(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(
+                "SELECT COUNT(*) FROM words WHERE id > ? AND (pronunciation IS NULL OR pronunciation = '')",
+                (self._load_watermark(conn),)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def run(self, progress_callback=None):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return self._run(conn, progress_callback)
+        finally:
+            conn.close()
+
+    def _run(self, conn, progress_callback):
+        last_id = self._load_watermark(conn)
+        chunks = self._iter_chunks(conn, last_id)
+        first = next(chunks, None)
+        if first is None:
+            return 0
+
+        updated = processed = 0
+        if len(first) < self.chunk_size:
+            # Too small to be worth starting worker processes
+            results = iter([_transcribe_chunk(first)])
+        else:
+            pool = ProcessPoolExecutor(max_workers=self.workers,
+                                       mp_context=multiprocessing.get_context('spawn'))
+            results = self._map_bounded(pool, [first], chunks)
+
+        for chunk_last_id, chunk_rows, updates in results:
+            conn.executemany(
+                "UPDATE words SET pronunciation = ? WHERE id = ? AND (pronunciation IS NULL OR pronunciation = '')",
+                updates
+            )
+            conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                         (self.WATERMARK_KEY, str(chunk_last_id)))
+            conn.commit()
+            updated += len(updates)
+            processed += chunk_rows
+            if progress_callback:
+                # Rows the transcriber cannot handle are skipped, so progress
+                # counts rows processed rather than rows written
+                progress_callback(processed)
+            if self.cancelled:
+                break
+        return updated
+
+    def _map_bounded(self, pool, head, chunks):
+        # Keep a couple of chunks per worker in flight so memory stays flat on huge
+        # tables; results are consumed in order so the watermark only moves forward
+        in_flight = []
+        try:
+            for rows in head:
+                in_flight.append(pool.submit(_transcribe_chunk, rows))
+            while in_flight:
+                while len(in_flight) < self.workers * 2 and not self.cancelled:
+                    rows = next(chunks, None)
+                    if rows is None:
+                        break
+                    in_flight.append(pool.submit(_transcribe_chunk, rows))
+                yield in_flight.pop(0).result()
+                if self.cancelled:
+                    break
+        finally:
+            for future in in_flight:
+                future.cancel()
+            pool.shutdown(wait=True)
+
+    def _iter_chunks(self, conn, last_id):
+        while True:
+            rows = conn.execute(
+                "SELECT id, word FROM words WHERE id > ? AND (pronunciation IS NULL OR pronunciation = '') "
+                "ORDER BY id LIMIT ?",
+                (last_id, self.chunk_size)
+            ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield rows
+
+    def _load_watermark(self, conn):
+        row = conn.execute("SELECT value FROM settings WHERE key = ?", (self.WATERMARK_KEY,)).fetchone()
+        return int(row[0]) if row else 0
+
+
+class QuizGenerator:
+    # Multiple-choice questions with distractors drawn from precomputed pools.
+    # Each pool holds the words sharing a part of speech and length bucket under
+    # dense slot numbers, so random picks are primary-key lookups on
+    # quiz_pools instead of ORDER BY RANDOM() scans. Broader pools (same part of
+    # speech, then everything) back up the small ones.
+    OPTIONS = 4
+    ANY = '*'
+    SIGNATURE_KEY = 'quiz_pool_signature'
+    # SQLite builds before 3.32 cap bound parameters at 999
+    MAX_PICKS_PER_QUERY = 400
+    
+    def __init__(self, db):
+        self.db = db
+    
+    def length_bucket(self, word):
+        length = len(word or '')
+        if length <= 4:
+            return 's'
+        if length <= 7:
+            return 'm'
+        return 'l'
+    
+    def pool_keys(self, part_of_speech, word):
+        # Most specific first
+        pos = (part_of_speech or '').lower()
+        return [f"{pos}|{self.length_bucket(word)}", f"{pos}|{self.ANY}", f"{self.ANY}|{self.ANY}"]
+    
+    def _signature(self):
+        count, max_id = self.db.conn.execute(
+            "SELECT COUNT(*), IFNULL(MAX(id), 0) FROM words WHERE IFNULL(definition, '') != ''").fetchone()
+        return f"{count}:{max_id}"
+    
+    def ensure_pools(self):
+        signature = self._signature()
+        row = self.db.conn.execute("SELECT value FROM settings WHERE key = ?", (self.SIGNATURE_KEY,)).fetchone()
+        if not row or row[0] != signature:
+            self.rebuild_pools(signature)
+    
+    def rebuild_pools(self, signature=None):
+        cursor = self.db.conn.cursor()
+        cursor.execute("DELETE FROM quiz_pools")
+        cursor.execute("DELETE FROM quiz_pool_sizes")
+        bucket = "CASE WHEN length(word) <= 4 THEN 's' WHEN length(word) <= 7 THEN 'm' ELSE 'l' END"
+        pos = "lower(IFNULL(part_of_speech, ''))"
+        for key_expression in (f"{pos} || '|' || {bucket}", f"{pos} || '|{self.ANY}'", f"'{self.ANY}|{self.ANY}'"):
+            cursor.execute(f'''
+                INSERT INTO quiz_pools (pool_key, slot, word_id)
+                SELECT pool_key, ROW_NUMBER() OVER (PARTITION BY pool_key ORDER BY id) - 1, id
+                FROM (SELECT {key_expression} AS pool_key, id FROM words WHERE IFNULL(definition, '') != '')
+            ''')
+        cursor.execute('''
+            INSERT INTO quiz_pool_sizes (pool_key, size)
+            SELECT pool_key, COUNT(*) FROM quiz_pools GROUP BY pool_key
+        ''')
+        cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                       (self.SIGNATURE_KEY, signature or self._signature()))
+        self.db.conn.commit()
+    
+    def generate(self, count):
+        # Returns up to `count` questions as
+        # (word_id, word, [(option_word_id, definition), ...]) with shuffled options
+        self.ensure_pools()
+        sizes = dict(self.db.conn.execute("SELECT pool_key, size FROM quiz_pool_sizes"))
+        everything = f"{self.ANY}|{self.ANY}"
+        total = sizes.get(everything, 0)
+        if total < self.OPTIONS:
+            return []
+        
+        target_slots = random.sample(range(total), min(count, total))
+        targets = self._fetch_picks([(everything, slot) for slot in target_slots])
+        
+        # Ask for one spare distractor per question in case the target itself is drawn
+        picks = []
+        questions = []
+        for word_id, word, definition, part_of_speech in targets:
+            pool_key = next(key for key in self.pool_keys(part_of_speech, word)
+                            if sizes.get(key, 0) >= self.OPTIONS)
+            slots = random.sample(range(sizes[pool_key]), self.OPTIONS)
+            picks.extend((pool_key, slot) for slot in slots)
+            questions.append((word_id, word, definition, [(pool_key, slot) for slot in slots]))
+        
+        picked = {}
+        for pick, row in zip(picks, self._fetch_picks(picks, keep_order=True)):
+            picked[pick] = row
+        
+        quiz = []
+        for word_id, word, definition, slots in questions:
+            options = [(word_id, definition)]
+            for pick in slots:
+                row = picked.get(pick)
+                if row and row[0] != word_id and row[2] != definition and len(options) < self.OPTIONS:
+                    options.append((row[0], row[2]))
+            random.shuffle(options)
+            quiz.append((word_id, word, options))
+        return quiz
+    
+    def _fetch_picks(self, picks, keep_order=False):
+        # One indexed join per batch of (pool_key, slot) pairs
+        rows = []
+        for start in range(0, len(picks), self.MAX_PICKS_PER_QUERY):
+            batch = picks[start:start + self.MAX_PICKS_PER_QUERY]
+            values = ','.join(['(?, ?, ?)'] * len(batch))
+            params = [value for position, pick in enumerate(batch) for value in (position,) + pick]
+            result = self.db.conn.execute(f'''
+                WITH picks (position, pool_key, slot) AS (VALUES {values})
+                SELECT picks.position, w.id, w.word, w.definition, w.part_of_speech
+                FROM picks
+                JOIN quiz_pools qp ON qp.pool_key = picks.pool_key AND qp.slot = picks.slot
+                JOIN words w ON w.id = qp.word_id
+                ORDER BY picks.position
+            ''', params).fetchall()
+            by_position = {row[0]: row[1:] for row in result}
+            if keep_order:
+                rows.extend(by_position.get(position) for position in range(len(batch)))
+            else:
+                rows.extend(by_position.values())
+        return rows
+
+
+class QuizAnswerLog:
+    # Buffers answer timings and writes them with one executemany per batch
+    BATCH_SIZE = 20
+    
+    def __init__(self, db):
+        self.db = db
+        self.pending = []
+    
+    def record(self, session, word_id, chosen_word_id, elapsed_ms):
+        self.pending.append((session, word_id, chosen_word_id, int(word_id == chosen_word_id),
+                             int(elapsed_ms), datetime.now().isoformat(timespec='seconds')))
+        if len(self.pending) >= self.BATCH_SIZE:
+            self.flush()
+    
+    def flush(self):
+        if not self.pending:
+            return
+        self.db.conn.executemany('''
+            INSERT INTO quiz_answers (session, word_id, chosen_word_id, correct, elapsed_ms, answered_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', self.pending)
+        self.db.conn.commit()
+        self.pending = []
+
+
+def lookup_key(text):
+    # Key used to match copied text against headwords
+    return normalize_key((text or '').strip().strip('.,;:!?"()[]{}<>'))
+
+
+class HotLookupIndex:
+    # Headword lookup for the clipboard popup that never touches the search
+    # path. The index is a sorted array of 64-bit key hashes with the matching
+    # row ids (16 bytes per word), searched with np.searchsorted; the row itself
+    # is one primary-key read. It is built on a background thread with its own
+    # connection and rebuilt when the set of headwords changes.
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.ready = False
+        self._signature = None
+        self._data_version = None
+        self._loading = False
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA query_only = 1")
+    
+    def _hash(self, key):
+        return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+    
+    def _headword_signature(self, conn):
+        return conn.execute("SELECT COUNT(*), IFNULL(MAX(id), 0) FROM words").fetchone()
+    
+    def start_loading(self):
+        with self._lock:
+            if self._loading:
+                return
+            self._loading = True
+        threading.Thread(target=self._load, name='hot-lookup-index', daemon=True).start()
+    
+    def _load(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with perf.span('clipboard.index_load'):
+                signature = self._headword_signature(conn)
+                rows = conn.execute("SELECT id, word FROM words").fetchall()
+                hashes = np.fromiter((self._hash(lookup_key(word)) for _, word in rows), dtype=np.uint64, count=len(rows))
+                ids = np.fromiter((word_id for word_id, _ in rows), dtype=np.int64, count=len(rows))
+                order = np.argsort(hashes, kind='stable')
+            with self._lock:
+                self.hashes, self.ids = hashes[order], ids[order]
+                self._signature = signature
+                self.ready = True
+        finally:
+            conn.close()
+            with self._lock:
+                self._loading = False
+    
+    def check_for_changes(self):
+        # data_version only moves when another connection commits, so the
+        # signature query runs only after the database has actually changed
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return
+            self._data_version = data_version
+            signature = self._headword_signature(self._conn)
+        if signature != self._signature:
+            self.start_loading()
+    
+    def lookup(self, text):
+        # Returns (word, part_of_speech, pronunciation, definition) or None
+        key = lookup_key(text)
+        if not key:
+            return None
+        with perf.span('clipboard.lookup'), self._lock:
+            if not self.ready:
+                # Still loading; the norm_key index answers exact matches
+                row = self._conn.execute(
+                    "SELECT word, part_of_speech, pronunciation, definition FROM words WHERE norm_key = ? LIMIT 1",
+                    (key,)).fetchone()
+                return row
+            target = np.uint64(self._hash(key))
+            start = int(np.searchsorted(self.hashes, target, side='left'))
+            end = int(np.searchsorted(self.hashes, target, side='right'))
+            for word_id in self.ids[start:end].tolist():
+                row = self._conn.execute(
+                    "SELECT word, part_of_speech, pronunciation, definition FROM words WHERE id = ?",
+                    (word_id,)).fetchone()
+                # Guards against hash collisions and rows deleted since the build
+                if row and lookup_key(row[0]) == key:
+                    return row
+            return None
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def sql_timestamp():
+    # Same clock and format as SQLite's CURRENT_TIMESTAMP, so rows written either
+    # way sort together
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class SyncManager:
+    # Delta sync of personal data (history, bookmarks, word lists) through a
+    # shared folder. Every local change is written to change_log stamped with a
+    # Lamport clock value and this device's id, and applied through the same code
+    # path as remote changes. A sync appends this device's new log entries to
+    # <folder>/<device_id>.log and reads each peer's log from the byte offset
+    # reached last time, so only changes since the watermark move.
+    # Conflicts resolve last-writer-wins on (lamport, device_id), a total order,
+    # so every device converges on the same state whatever order logs arrive in.
+    # History rows are keyed by a uid and only ever added; clearing history is a
+    # tombstone that removes every entry older than itself.
+    DEVICE_KEY = 'sync_device_id'
+    CLOCK_KEY = 'sync_clock'
+    FOLDER_KEY = 'sync_folder'
+    EXPORTED_KEY = 'sync_exported_seq'
+    LOG_SUFFIX = '.log'
+    
+    def __init__(self, db):
+        self.db = db
+        settings = dict(self.db.conn.execute(
+            "SELECT key, value FROM settings WHERE key IN (?, ?, ?)",
+            (self.DEVICE_KEY, self.CLOCK_KEY, self.FOLDER_KEY)))
+        self.device_id = settings.get(self.DEVICE_KEY)
+        self.clock = int(settings.get(self.CLOCK_KEY, 0))
+        self.folder = settings.get(self.FOLDER_KEY) or None
+        self.skipped = 0
+        if self.device_id is None:
+            self.device_id = uuid.uuid4().hex[:12]
+            self._set_setting(self.DEVICE_KEY, self.device_id)
+            self._bootstrap()
+            self.db.conn.commit()
+    
+    def _set_setting(self, key, value):
+        self.db.conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, str(value)))
+    
+    def _tick(self, seen=0):
+        self.clock = max(self.clock, seen) + 1
+        self._set_setting(self.CLOCK_KEY, self.clock)
+        return self.clock
+    
+    def _bootstrap(self):
+        # Log the data that existed before sync was set up so peers receive it
+        for row_id, word, timestamp in self.db.conn.execute(
+                "SELECT id, word, timestamp FROM search_history WHERE uid IS NULL ORDER BY id").fetchall():
+            lamport = self._tick()
+            uid = f"{self.device_id}-{lamport}"
+            self.db.conn.execute("UPDATE search_history SET uid = ?, lamport = ?, device_id = ? WHERE id = ?",
+                              (uid, lamport, self.device_id, row_id))
+            self._log(lamport, 'search_history', uid, 'insert', {'word': word, 'timestamp': timestamp})
+        for word, timestamp in self.db.conn.execute("SELECT word, timestamp FROM bookmarks").fetchall():
+            self.record('bookmarks', word, 'upsert', {'timestamp': timestamp})
+        for name, words, created_date in self.db.conn.execute(
+                "SELECT list_name, words, created_date FROM word_lists").fetchall():
+            self.record('word_lists', name, 'upsert', {'words': words, 'created_date': created_date})
+    
+    # Local changes
+    
+    def record(self, table, key, op, payload=None):
+        # Stamps, logs and applies one local change; the caller commits. The
+        # time of the action goes into the payload so peers keep it instead of
+        # the time they happen to apply the change.
+        payload = dict(payload or {})
+        if op in ('insert', 'upsert'):
+            field = 'created_date' if table == 'word_lists' else 'timestamp'
+            if not payload.get(field):
+                payload[field] = self._created_date(key) if table == 'word_lists' else sql_timestamp()
+        lamport = self._tick()
+        if table == 'search_history' and op == 'insert' and key is None:
+            # New entry; imported entries keep the uid they were exported with
+            key = f"{self.device_id}-{lamport}"
+        self._log(lamport, table, key, op, payload)
+        self.apply(table, key, op, payload, lamport, self.device_id)
+        return key
+    
+    def _created_date(self, list_name):
+        # Saving an existing word list keeps its original creation time
+        row = self.db.conn.execute("SELECT created_date FROM word_lists WHERE list_name = ?", (list_name,)).fetchone()
+        return row[0] if row and row[0] else sql_timestamp()
+    
+    def _log(self, lamport, table, key, op, payload):
+        self.db.conn.execute('''
+            INSERT INTO change_log (lamport, device_id, table_name, row_key, op, payload)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (lamport, self.device_id, table, key, op, json.dumps(payload or {})))
+    
+    # Applying changes
+    
+    def _newer_than_current(self, table, key, lamport, device_id):
+        current = self.db.conn.execute(
+            "SELECT lamport, device_id FROM sync_versions WHERE table_name = ? AND row_key = ?",
+            (table, key)).fetchone()
+        if current is not None and tuple(current) >= (lamport, device_id):
+            return False
+        self.db.conn.execute('''
+            INSERT OR REPLACE INTO sync_versions (table_name, row_key, lamport, device_id)
+            VALUES (?, ?, ?, ?)
+        ''', (table, key, lamport, device_id))
+        return True
+    
+    def apply(self, table, key, op, payload, lamport, device_id):
+        if table == 'search_history':
+            if op == 'clear':
+                if self._newer_than_current(table, '*', lamport, device_id):
+                    self.db.conn.execute("DELETE FROM search_history WHERE (lamport, device_id) < (?, ?)",
+                                      (lamport, device_id))
+                return
+            cleared = self.db.conn.execute(
+                "SELECT lamport, device_id FROM sync_versions WHERE table_name = 'search_history' AND row_key = '*'"
+            ).fetchone()
+            if cleared is not None and tuple(cleared) > (lamport, device_id):
+                return
+            self.db.conn.execute('''
+                INSERT OR IGNORE INTO search_history (word, timestamp, uid, lamport, device_id)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (payload.get('word'), payload.get('timestamp'), key, lamport, device_id))
+            return
+        
+        if not self._newer_than_current(table, key, lamport, device_id):
+            return
+        if table == 'bookmarks':
+            if op == 'delete':
+                self.db.conn.execute("DELETE FROM bookmarks WHERE word = ?", (key,))
+            else:
+                self.db.conn.execute('''
+                    INSERT INTO bookmarks (word, timestamp) VALUES (?, ?)
+                    ON CONFLICT (word) DO UPDATE SET timestamp = excluded.timestamp
+                ''', (key, payload.get('timestamp')))
+        elif table == 'word_lists':
+            if op == 'delete':
+                self.db.conn.execute("DELETE FROM word_lists WHERE list_name = ?", (key,))
+            else:
+                cursor = self.db.conn.execute("UPDATE word_lists SET words = ? WHERE list_name = ?",
+                                           (payload.get('words', ''), key))
+                if cursor.rowcount == 0:
+                    self.db.conn.execute('''
+                        INSERT INTO word_lists (list_name, words, created_date)
+                        VALUES (?, ?, ?)
+                    ''', (key, payload.get('words', ''), payload.get('created_date')))
+    
+    # Folder sync
+    
+    def set_folder(self, folder):
+        self.folder = folder
+        self._set_setting(self.FOLDER_KEY, folder)
+        self.db.conn.commit()
+    
+    def sync(self):
+        # Returns (sent, received) change counts; peer log lines that could not
+        # be read are counted in self.skipped
+        self.skipped = 0
+        if not self.folder:
+            return 0, 0
+        os.makedirs(self.folder, exist_ok=True)
+        try:
+            sent = self._export()
+            # Commit the export watermark as soon as the log file is written, so
+            # a failed import never makes the same changes go out twice
+            self.db.conn.commit()
+            received = self._import()
+            self.db.conn.commit()
+        except Exception:
+            self.db.conn.rollback()
+            raise
+        return sent, received
+    
+    def _export(self):
+        row = self.db.conn.execute("SELECT value FROM settings WHERE key = ?", (self.EXPORTED_KEY,)).fetchone()
+        exported = int(row[0]) if row else 0
+        rows = self.db.conn.execute('''
+            SELECT seq, lamport, table_name, row_key, op, payload FROM change_log
+            WHERE seq > ? AND device_id = ? ORDER BY seq
+        ''', (exported, self.device_id)).fetchall()
+        if not rows:
+            return 0
+        lines = [
+            json.dumps({'lamport': lamport, 'device': self.device_id, 'table': table,
+                        'key': key, 'op': op, 'payload': json.loads(payload)}, ensure_ascii=False) + '\n'
+            for _, lamport, table, key, op, payload in rows
+        ]
+        path = os.path.join(self.folder, self.device_id + self.LOG_SUFFIX)
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    # Terminate a line left half-written by an interrupted sync
+                    lines.insert(0, '\n')
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(''.join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        self._set_setting(self.EXPORTED_KEY, rows[-1][0])
+        return len(rows)
+    
+    def _import(self):
+        received = 0
+        for filename in os.listdir(self.folder):
+            peer, suffix = os.path.splitext(filename)
+            if suffix != self.LOG_SUFFIX or peer == self.device_id:
+                continue
+            row = self.db.conn.execute("SELECT byte_offset FROM sync_peers WHERE peer = ?", (peer,)).fetchone()
+            offset = row[0] if row else 0
+            try:
+                with open(os.path.join(self.folder, filename), 'rb') as f:
+                    f.seek(offset)
+                    data = f.read()
+            except OSError:
+                # Unreadable for now (e.g. still syncing); retried next time
+                continue
+            # A peer may be mid-write; stop at the last complete line
+            end = data.rfind(b'\n') + 1
+            for line in data[:end].splitlines():
+                if not line.strip():
+                    continue
+                # A damaged line is skipped rather than blocking every later one
+                try:
+                    change = json.loads(line)
+                    lamport, device = int(change['lamport']), str(change['device'])
+                    table, key, op = change['table'], change['key'], change['op']
+                    payload = change.get('payload') or {}
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    self.skipped += 1
+                    continue
+                if not isinstance(payload, dict):
+                    self.skipped += 1
+                    continue
+                self._tick(lamport)
+                self.apply(table, key, op, payload, lamport, device)
+                received += 1
+            if end:
+                self.db.conn.execute("INSERT OR REPLACE INTO sync_peers (peer, byte_offset) VALUES (?, ?)",
+                                  (peer, offset + end))
+        return received
+
+
+class ReaderAnalysis:
+    # Vocabulary lookup for a whole document. Distinct tokens go into a temp
+    # table and are resolved with a single join against words (and bookmarks),
+    # instead of one search per word.
+    TOKEN_PATTERN = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+    TOP_UNKNOWN = 30
+    
+    def __init__(self, conn, text):
+        self.conn = conn
+        self.text = text
+        self.tokens = [normalize_key(token) for token in self.TOKEN_PATTERN.findall(text)]
+        self.entries = {}
+    
+    def run(self):
+        counts = {}
+        for token in self.tokens:
+            counts[token] = counts.get(token, 0) + 1
+        self.counts = counts
+        
+        cursor = self.conn.cursor()
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS reader_tokens (token TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM reader_tokens")
+        cursor.executemany("INSERT INTO reader_tokens (token) VALUES (?)", ((token,) for token in counts))
+        cursor.execute('''
+            SELECT t.token, w.part_of_speech, w.definition, b.word IS NOT NULL
+            FROM reader_tokens t
+            JOIN words w ON w.norm_key = t.token
+            LEFT JOIN bookmarks b ON b.word = w.word
+        ''')
+        self.entries = {token: (part_of_speech, definition, bool(bookmarked))
+                        for token, part_of_speech, definition, bookmarked in cursor.fetchall()}
+        cursor.execute("DELETE FROM reader_tokens")
+        self.conn.commit()
+        return self
+    
+    def stats(self):
+        total = len(self.tokens)
+        distinct = len(self.counts)
+        known_tokens = sum(count for token, count in self.counts.items() if token in self.entries)
+        unknown = sorted(((count, token) for token, count in self.counts.items() if token not in self.entries),
+                         key=lambda item: (-item[0], item[1]))
+        return {
+            'tokens': total,
+            'distinct': distinct,
+            'known_tokens': known_tokens,
+            'known_distinct': len(self.entries),
+            'token_coverage': known_tokens / total if total else 0.0,
+            'type_coverage': len(self.entries) / distinct if distinct else 0.0,
+            'bookmarked': sum(1 for entry in self.entries.values() if entry[2]),
+            'top_unknown': unknown[:self.TOP_UNKNOWN],
+        }
+    
+    def html_chunks(self, tokens_per_chunk=5000):
+        # Yields the marked-up document in pieces so the view can stream it
+        parts = []
+        position = 0
+        in_chunk = 0
+        for match in self.TOKEN_PATTERN.finditer(self.text):
+            parts.append(self._escape(self.text[position:match.start()]))
+            token = match.group(0)
+            entry = self.entries.get(normalize_key(token))
+            if entry is None:
+                parts.append(f'<span style="color: #e74c3c; text-decoration: underline;">{self._escape(token)}</span>')
+            elif entry[2]:
+                parts.append(f'<span style="background-color: #f9e79f;">{self._escape(token)}</span>')
+            else:
+                parts.append(self._escape(token))
+            position = match.end()
+            in_chunk += 1
+            if in_chunk >= tokens_per_chunk:
+                yield ''.join(parts)
+                parts = []
+                in_chunk = 0
+        parts.append(self._escape(self.text[position:]))
+        yield ''.join(parts)
+    
+    def _escape(self, text):
+        return (text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+                .replace('\n', '<br>'))
+
 
 class WordCard(QWidget):
-    def __init__(self, word_data, parent=None):
+    def __init__(self, word_data, parent=None, source=None, db=None):
         super().__init__(parent)
         self.word_data = word_data
-        self.setup_ui()
+        self.source = source
+        self.db = db
+        with perf.span('ui.word_card'):
+            self.setup_ui()
     
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -116,6 +2038,12 @@ class WordCard(QWidget):
         
         header_layout.addStretch()
         
+        # Which dictionary the entry came from
+        if self.source:
+            source_label = QLabel(self.source)
+            source_label.setStyleSheet("font-size: 12px; color: #95a5a6;")
+            header_layout.addWidget(source_label)
+        
         # Audio button
         audio_btn = QPushButton("🔊")
         audio_btn.setFixedSize(30, 30)
@@ -123,10 +2051,13 @@ class WordCard(QWidget):
         header_layout.addWidget(audio_btn)
         
         # Bookmark button
-        bookmark_btn = QPushButton("⭐")
-        bookmark_btn.setFixedSize(30, 30)
-        bookmark_btn.clicked.connect(self.toggle_bookmark)
-        header_layout.addWidget(bookmark_btn)
+        self.bookmark_btn = QPushButton("⭐")
+        self.bookmark_btn.setFixedSize(30, 30)
+        self.bookmark_btn.setCheckable(True)
+        if self.db is not None:
+            self.bookmark_btn.setChecked(self.db.is_bookmarked(self.word_data[1]))
+        self.bookmark_btn.clicked.connect(self.toggle_bookmark)
+        header_layout.addWidget(self.bookmark_btn)
         
         layout.addLayout(header_layout)
         
@@ -184,24 +2115,142 @@ class WordCard(QWidget):
             word = self.word_data[1]
             tts = gTTS(text=word, lang='en')
             with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-                tts.save(temp_file.name)
-                pygame.mixer.init()
-                pygame.mixer.music.load(temp_file.name)
-                pygame.mixer.music.play()
+                with perf.span('tts.synthesize'):
+                    tts.save(temp_file.name)
+                with perf.span('tts.playback'):
+                    pygame.mixer.init()
+                    pygame.mixer.music.load(temp_file.name)
+                    pygame.mixer.music.play()
         except Exception as e:
             QMessageBox.warning(self, "Audio Error", f"Could not play pronunciation: {str(e)}")
     
     def toggle_bookmark(self):
-        # Toggle bookmark functionality
-        pass
+        if self.db is None:
+            return
+        word = self.word_data[1]
+        if self.db.is_bookmarked(word):
+            self.db.remove_bookmark(word)
+        else:
+            self.db.add_bookmark(word)
+        self.bookmark_btn.setChecked(self.db.is_bookmarked(word))
+
+class ClipboardPopup(QFrame):
+    HIDE_AFTER_MS = 6000
+    
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.ToolTip | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
+        self.setStyleSheet("""
+            ClipboardPopup {
+                background-color: white;
+                border: 1px solid #007bff;
+                border-radius: 6px;
+            }
+        """)
+        self.setMaximumWidth(360)
+        
+        layout = QVBoxLayout(self)
+        self.word_label = QLabel("")
+        self.word_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #2c3e50;")
+        layout.addWidget(self.word_label)
+        
+        self.definition_label = QLabel("")
+        self.definition_label.setWordWrap(True)
+        self.definition_label.setStyleSheet("font-size: 13px; color: #2c3e50;")
+        layout.addWidget(self.definition_label)
+        
+        self.hide_timer = QTimer(self)
+        self.hide_timer.setSingleShot(True)
+        self.hide_timer.timeout.connect(self.hide)
+    
+    def show_entry(self, entry):
+        word, part_of_speech, pronunciation, definition = entry
+        header = word
+        if pronunciation:
+            header += f"  {pronunciation}"
+        if part_of_speech:
+            header += f"  ({part_of_speech})"
+        self.word_label.setText(header)
+        self.definition_label.setText(definition or "")
+        self.adjustSize()
+        self.move(QCursor.pos() + QPoint(12, 12))
+        self.show()
+        self.raise_()
+        self.hide_timer.start(self.HIDE_AFTER_MS)
+    
+    def mousePressEvent(self, event):
+        self.hide()
+
+
+class ReaderView(QTextBrowser):
+    # Shows the definition of the word under the mouse. Looking the word up from
+    # the cursor position avoids an anchor per word in very long documents.
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = {}
+        self.setMouseTracking(True)
+    
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        entry = self.entries.get(normalize_key(self.token_at(event.pos())))
+        if entry:
+            part_of_speech, definition, _ = entry
+            tip = f"({part_of_speech}) {definition}" if part_of_speech else definition
+            QToolTip.showText(event.globalPos(), tip, self)
+        else:
+            QToolTip.hideText()
+    
+    def token_at(self, pos):
+        # Same tokenization as ReaderAnalysis, so words like ng'ombe stay whole
+        # (WordUnderCursor splits at the apostrophe)
+        cursor = self.cursorForPosition(pos)
+        offset = cursor.positionInBlock()
+        for match in ReaderAnalysis.TOKEN_PATTERN.finditer(cursor.block().text()):
+            if match.start() > offset:
+                break
+            if offset <= match.end():
+                return match.group()
+        return ''
+
 
 class kiswaziDictionary(QMainWindow):
-    def __init__(self):
+    # Emitted from the maintenance thread with (integrity problems, error)
+    maintenance_finished = pyqtSignal(list, str)
+    # Scheduled maintenance re-checks whether it is due this often
+    MAINTENANCE_CHECK_MS = 6 * 60 * 60 * 1000
+    SEARCH_PAGE_SIZE = 20
+    # Catching the pattern index up on more words than this shows a progress dialog
+    GRAM_INDEX_PROGRESS_THRESHOLD = 20000
+    
+    def __init__(self, db_path=None):
         super().__init__()
-        self.db = DatabaseManager()
-        self.init_ui()
-        self.load_settings()
+        with perf.span('startup.database'):
+            self.db = DatabaseManager(db_path)
+        self.search_query = ''
+        # Mode of the current result list; Load More pages from this, not the combo box
+        self.search_kind = 'word'
+        self.search_offset = 0
+        self.pattern_search = None
+        self.load_more_btn = None
+        self.quiz_generator = QuizGenerator(self.db)
+        self.quiz_answers = QuizAnswerLog(self.db)
+        self.quiz_active = False
+        self.hot_index = HotLookupIndex(self.db.db_path)
+        self.clipboard_popup = ClipboardPopup()
+        with perf.span('startup.ui'):
+            self.init_ui()
+        with perf.span('startup.settings'):
+            self.load_settings()
         self.show_word_of_day()
+        self.sync_personal_data(quiet=True)
+        
+        # The integrity check and scheduled maintenance run off the GUI thread,
+        # now and then from the timer
+        self.maintenance_thread = None
+        self.maintenance_finished.connect(self.on_maintenance_finished)
+        self.maintenance_timer = QTimer(self)
+        self.maintenance_timer.timeout.connect(self.run_maintenance)
+        self.maintenance_timer.start(self.MAINTENANCE_CHECK_MS)
+        self.run_maintenance()
     
     def init_ui(self):
         self.setWindowTitle("kiswazi Dictionary - Language Helper")
@@ -265,12 +2314,40 @@ class kiswaziDictionary(QMainWindow):
         self.create_dictionary_tab()
         self.create_translator_tab()
         self.create_vocabulary_tab()
+        self.create_reader_tab()
         self.create_grammar_tab()
         self.create_history_tab()
         self.create_settings_tab()
         
         # Create status bar
         self.statusBar().showMessage("Ready")
+        
+        self.create_tray_icon()
+        QApplication.clipboard().dataChanged.connect(self.on_clipboard_changed)
+    
+    def create_tray_icon(self):
+        self.tray_icon = None
+        if not QSystemTrayIcon.isSystemTrayAvailable():
+            return
+        
+        self.tray_icon = QSystemTrayIcon(self.style().standardIcon(QStyle.SP_FileDialogDetailedView), self)
+        self.tray_icon.setToolTip("kiswazi Dictionary")
+        
+        tray_menu = QMenu(self)
+        show_action = tray_menu.addAction("Show Dictionary")
+        show_action.triggered.connect(self.restore_from_tray)
+        
+        self.tray_clipboard_action = tray_menu.addAction("Look Up Copied Words")
+        self.tray_clipboard_action.setCheckable(True)
+        self.tray_clipboard_action.toggled.connect(lambda checked: self.clipboard_lookup_check.setChecked(checked))
+        
+        tray_menu.addSeparator()
+        quit_action = tray_menu.addAction("Quit")
+        quit_action.triggered.connect(self.close)
+        
+        self.tray_icon.setContextMenu(tray_menu)
+        self.tray_icon.activated.connect(self.on_tray_activated)
+        self.tray_icon.show()
     
     def create_header(self, layout):
         header_layout = QHBoxLayout()
@@ -289,6 +2366,14 @@ class kiswaziDictionary(QMainWindow):
         self.search_input.returnPressed.connect(self.search_word)
         header_layout.addWidget(self.search_input)
         
+        # Search mode
+        self.search_mode = QComboBox()
+        self.search_mode.addItem("Word", "word")
+        self.search_mode.addItem("Meaning", "meaning")
+        self.search_mode.addItem("Pattern", "pattern")
+        self.search_mode.currentIndexChanged.connect(self.update_search_placeholder)
+        header_layout.addWidget(self.search_mode)
+        
         # Search button
         search_btn = QPushButton("Search")
         search_btn.clicked.connect(self.search_word)
@@ -418,6 +2503,19 @@ class kiswaziDictionary(QMainWindow):
         
         right_layout.addWidget(self.flashcard)
         
+        # Multiple-choice answers, shown only while a quiz is running
+        self.quiz_panel = QWidget()
+        quiz_layout = QVBoxLayout(self.quiz_panel)
+        quiz_layout.setContentsMargins(0, 0, 0, 0)
+        self.quiz_option_btns = []
+        for index in range(QuizGenerator.OPTIONS):
+            option_btn = QPushButton("")
+            option_btn.clicked.connect(lambda checked, i=index: self.answer_quiz_question(i))
+            quiz_layout.addWidget(option_btn)
+            self.quiz_option_btns.append(option_btn)
+        self.quiz_panel.setVisible(False)
+        right_layout.addWidget(self.quiz_panel)
+        
         # Flashcard controls
         controls_layout = QHBoxLayout()
         
@@ -435,12 +2533,58 @@ class kiswaziDictionary(QMainWindow):
         self.next_btn.setEnabled(False)
         controls_layout.addWidget(self.next_btn)
         
+        self.start_quiz_btn = QPushButton("Start Quiz")
+        self.start_quiz_btn.clicked.connect(self.start_quiz)
+        controls_layout.addWidget(self.start_quiz_btn)
+        
         right_layout.addLayout(controls_layout)
         
         layout.addWidget(right_panel)
         
         self.tab_widget.addTab(tab, "Vocabulary")
     
+    def create_reader_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+        
+        # Text input
+        self.reader_input = QTextEdit()
+        self.reader_input.setAcceptRichText(False)
+        self.reader_input.setPlaceholderText("Paste a Swahili or English text, or open a file...")
+        self.reader_input.setMaximumHeight(120)
+        layout.addWidget(self.reader_input)
+        
+        reader_controls = QHBoxLayout()
+        open_text_btn = QPushButton("Open File...")
+        open_text_btn.clicked.connect(self.open_reader_file)
+        reader_controls.addWidget(open_text_btn)
+        
+        analyze_btn = QPushButton("Read")
+        analyze_btn.clicked.connect(self.analyze_reader_text)
+        reader_controls.addWidget(analyze_btn)
+        reader_controls.addStretch()
+        layout.addLayout(reader_controls)
+        
+        self.reader_stats = QLabel("")
+        self.reader_stats.setWordWrap(True)
+        layout.addWidget(self.reader_stats)
+        
+        # Highlighted text and unknown words
+        reader_splitter = QSplitter(Qt.Horizontal)
+        self.reader_output = ReaderView()
+        reader_splitter.addWidget(self.reader_output)
+        
+        self.reader_unknown_list = QListWidget()
+        self.reader_unknown_list.itemDoubleClicked.connect(
+            lambda item: self.lookup_word(item.data(Qt.UserRole)))
+        reader_splitter.addWidget(self.reader_unknown_list)
+        reader_splitter.setStretchFactor(0, 3)
+        reader_splitter.setStretchFactor(1, 1)
+        layout.addWidget(reader_splitter)
+        
+        self.reader_chunks = None
+        self.tab_widget.addTab(tab, "Reader")
+    
     def create_grammar_tab(self):
         tab = QWidget()
         layout = QVBoxLayout(tab)
@@ -542,8 +2686,34 @@ class kiswaziDictionary(QMainWindow):
         self.auto_translate_check = QCheckBox("Auto-translate unknown words")
         language_layout.addWidget(self.auto_translate_check)
         
+        self.clipboard_lookup_check = QCheckBox("Look up copied words while minimized")
+        self.clipboard_lookup_check.toggled.connect(self.toggle_clipboard_lookup)
+        language_layout.addWidget(self.clipboard_lookup_check)
+        
         layout.addWidget(language_group)
         
+        # Dictionary sources
+        sources_group = QGroupBox("Dictionaries")
+        sources_layout = QVBoxLayout(sources_group)
+        
+        self.sources_list = QListWidget()
+        self.sources_list.setMaximumHeight(120)
+        self.sources_list.itemChanged.connect(self.toggle_dictionary_source)
+        sources_layout.addWidget(self.sources_list)
+        
+        sources_buttons = QHBoxLayout()
+        add_source_btn = QPushButton("Add Dictionary...")
+        add_source_btn.clicked.connect(self.add_dictionary_source)
+        sources_buttons.addWidget(add_source_btn)
+        
+        remove_source_btn = QPushButton("Remove Dictionary")
+        remove_source_btn.clicked.connect(self.remove_dictionary_source)
+        sources_buttons.addWidget(remove_source_btn)
+        sources_layout.addLayout(sources_buttons)
+        
+        layout.addWidget(sources_group)
+        self.load_dictionary_sources()
+        
         # Data settings
         data_group = QGroupBox("Data Management")
         data_layout = QVBoxLayout(data_group)
@@ -556,8 +2726,71 @@ class kiswaziDictionary(QMainWindow):
         import_btn.clicked.connect(self.import_data)
         data_layout.addWidget(import_btn)
         
+        sync_layout = QHBoxLayout()
+        self.sync_folder_label = QLabel("")
+        self.sync_folder_label.setWordWrap(True)
+        sync_layout.addWidget(self.sync_folder_label, 1)
+        
+        sync_folder_btn = QPushButton("Sync Folder...")
+        sync_folder_btn.clicked.connect(self.choose_sync_folder)
+        sync_layout.addWidget(sync_folder_btn)
+        
+        sync_now_btn = QPushButton("Sync Now")
+        sync_now_btn.clicked.connect(self.sync_personal_data)
+        sync_layout.addWidget(sync_now_btn)
+        data_layout.addLayout(sync_layout)
+        self.update_sync_label()
+        
+        import_words_btn = QPushButton("Import Words (CSV)")
+        import_words_btn.clicked.connect(self.import_words)
+        data_layout.addWidget(import_words_btn)
+        
+        pronunciation_btn = QPushButton("Generate Missing Pronunciations")
+        pronunciation_btn.clicked.connect(self.generate_pronunciations)
+        data_layout.addWidget(pronunciation_btn)
+        
         layout.addWidget(data_group)
         
+        # Diagnostics (hidden; Ctrl+Shift+D toggles it)
+        self.diagnostics_group = QGroupBox("Diagnostics")
+        diagnostics_layout = QVBoxLayout(self.diagnostics_group)
+        
+        self.diagnostics_check = QCheckBox("Record performance data")
+        self.diagnostics_check.setChecked(perf.enabled)
+        self.diagnostics_check.toggled.connect(self.toggle_diagnostics)
+        diagnostics_layout.addWidget(self.diagnostics_check)
+        
+        self.diagnostics_table = QTableWidget(0, 6)
+        self.diagnostics_table.setHorizontalHeaderLabels(["Timer", "Count", "p50 ms", "p95 ms", "p99 ms", "Max ms"])
+        self.diagnostics_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.diagnostics_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.diagnostics_table.setMinimumHeight(200)
+        diagnostics_layout.addWidget(self.diagnostics_table)
+        
+        self.diagnostics_counters = QLabel("")
+        self.diagnostics_counters.setWordWrap(True)
+        diagnostics_layout.addWidget(self.diagnostics_counters)
+        
+        diagnostics_buttons = QHBoxLayout()
+        refresh_stats_btn = QPushButton("Refresh")
+        refresh_stats_btn.clicked.connect(self.refresh_diagnostics)
+        diagnostics_buttons.addWidget(refresh_stats_btn)
+        
+        trace_btn = QPushButton("Save Trace...")
+        trace_btn.clicked.connect(self.save_trace)
+        diagnostics_buttons.addWidget(trace_btn)
+        
+        clear_stats_btn = QPushButton("Clear")
+        clear_stats_btn.clicked.connect(self.clear_diagnostics)
+        diagnostics_buttons.addWidget(clear_stats_btn)
+        diagnostics_layout.addLayout(diagnostics_buttons)
+        
+        self.diagnostics_group.setVisible(False)
+        layout.addWidget(self.diagnostics_group)
+        
+        diagnostics_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        diagnostics_shortcut.activated.connect(self.toggle_diagnostics_panel)
+        
         layout.addStretch()
         
         self.tab_widget.addTab(tab, "Settings")
@@ -567,41 +2800,129 @@ class kiswaziDictionary(QMainWindow):
         if not query:
             return
         
-        # Add to search history
-        cursor = self.db.conn.cursor()
-        cursor.execute("INSERT INTO search_history (word) VALUES (?)", (query,))
-        self.db.conn.commit()
-        
-        # Search in database
-        cursor.execute("""
-            SELECT * FROM words WHERE word LIKE ? OR definition LIKE ?
-        """, (f"%{query}%", f"%{query}%"))
+        perf.count('search.queries')
         
-        results = cursor.fetchall()
+        # Add to search history
+        with perf.span('search.sql.history_insert'):
+            self.db.add_history(query)
         
         # Clear previous results
         self.clear_results()
-        
-        if results:
-            for word_data in results:
-                word_card = WordCard(word_data)
-                self.results_layout.addWidget(word_card)
-            self.statusBar().showMessage(f"Found {len(results)} result(s)")
+        self.search_query = query
+        self.search_kind = self.search_mode.currentData()
+        self.search_offset = 0
+        
+        if self.search_kind in ('meaning', 'pattern') and not self.db.federation.main_source().enabled:
+            self.show_search_notice(f"{self.search_mode.currentText()} search only covers the main dictionary, "
+                                    f"which is disabled in Settings")
+            self.statusBar().showMessage("Main dictionary disabled")
+        elif self.load_more_results():
+            self.statusBar().showMessage(f"Showing top {self.search_offset} result(s)")
         else:
-            no_results = QLabel(f"No results found for '{query}'")
-            no_results.setAlignment(Qt.AlignCenter)
-            no_results.setStyleSheet("font-size: 16px; color: #7f8c8d; padding: 50px;")
-            self.results_layout.addWidget(no_results)
+            self.show_search_notice(f"No results found for '{query}'")
             self.statusBar().showMessage("No results found")
         
         # Switch to dictionary tab
         self.tab_widget.setCurrentIndex(0)
     
+    def load_more_results(self):
+        # Fetches one more page of ranked results (plus one row to know whether
+        # another page exists) and appends it below the current cards
+        if self.load_more_btn is not None:
+            self.results_layout.removeWidget(self.load_more_btn)
+            self.load_more_btn.deleteLater()
+            self.load_more_btn = None
+        
+        if self.search_kind == 'meaning':
+            results = self.db.reverse_search(self.search_query, self.SEARCH_PAGE_SIZE + 1, self.search_offset)
+            if results is None:
+                self.build_reverse_index()
+                results = self.db.reverse_search(self.search_query, self.SEARCH_PAGE_SIZE + 1, self.search_offset) or []
+        elif self.search_kind == 'pattern':
+            if self.search_offset == 0:
+                if self.db.gram_index.pending() > self.GRAM_INDEX_PROGRESS_THRESHOLD:
+                    self.build_gram_index()
+                self.pattern_search = self.db.pattern_search(self.search_query)
+            rows, has_more = self.pattern_search.next_page(self.SEARCH_PAGE_SIZE)
+            # Pattern matches are unranked; the extra row only signals another page
+            results = [(0, MAIN_SOURCE_NAME, row) for row in rows] + ([None] if has_more else [])
+        else:
+            # Search every enabled dictionary
+            with perf.span('search.sql.lookup'):
+                results = self.db.federation.search(self.search_query, self.SEARCH_PAGE_SIZE + 1, self.search_offset)
+        perf.count('search.rows', len(results))
+        
+        page = results[:self.SEARCH_PAGE_SIZE]
+        show_source = len(self.db.federation.enabled_sources()) > 1
+        with perf.span('search.render'):
+            for _, source_name, word_data in page:
+                word_card = WordCard(word_data, source=source_name if show_source else None, db=self.db)
+                self.results_layout.addWidget(word_card)
+        self.search_offset += len(page)
+        
+        if len(results) > self.SEARCH_PAGE_SIZE:
+            self.load_more_btn = QPushButton("Load More")
+            self.load_more_btn.clicked.connect(self.show_more_results)
+            self.results_layout.addWidget(self.load_more_btn)
+        return len(page)
+    
+    def show_search_notice(self, text):
+        notice = QLabel(text)
+        notice.setAlignment(Qt.AlignCenter)
+        notice.setWordWrap(True)
+        notice.setStyleSheet("font-size: 16px; color: #7f8c8d; padding: 50px;")
+        self.results_layout.addWidget(notice)
+    
+    def build_reverse_index(self):
+        progress = QProgressDialog("Indexing definitions for meaning search...", None, 0, 0, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+        
+        def on_progress(done, total):
+            progress.setMaximum(total)
+            progress.setValue(done)
+            QApplication.processEvents()
+        
+        try:
+            with perf.span('search.reverse_build'):
+                self.db.reverse_index.build(on_progress)
+        finally:
+            progress.close()
+    
+    def build_gram_index(self):
+        progress = QProgressDialog("Indexing headwords for pattern search...", None, 0, 0, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+        
+        def on_progress(done):
+            progress.setLabelText(f"Indexing headwords for pattern search... {done:,}")
+            QApplication.processEvents()
+        
+        try:
+            with perf.span('search.pattern_index'):
+                self.db.gram_index.update(on_progress)
+        finally:
+            progress.close()
+    
+    def update_search_placeholder(self):
+        if self.search_mode.currentData() == 'meaning':
+            self.search_input.setPlaceholderText("Describe the meaning...")
+        elif self.search_mode.currentData() == 'pattern':
+            self.search_input.setPlaceholderText("Pattern, e.g. k?t?b* or ??ana ([abc] matches one of a, b, c)")
+        else:
+            self.search_input.setPlaceholderText("Search for a word...")
+    
+    def show_more_results(self):
+        self.load_more_results()
+        self.statusBar().showMessage(f"Showing top {self.search_offset} result(s)")
+    
     def clear_results(self):
-        while self.results_layout.count():
-            child = self.results_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        with perf.span('ui.clear_results'):
+            while self.results_layout.count():
+                child = self.results_layout.takeAt(0)
+                if child.widget():
+                    child.widget().deleteLater()
+            self.load_more_btn = None
     
     def show_random_word(self):
         cursor = self.db.conn.cursor()
@@ -610,7 +2931,7 @@ class kiswaziDictionary(QMainWindow):
         
         if result:
             self.clear_results()
-            word_card = WordCard(result)
+            word_card = WordCard(result, db=self.db)
             self.results_layout.addWidget(word_card)
             self.statusBar().showMessage("Random word displayed")
     
@@ -635,6 +2956,7 @@ class kiswaziDictionary(QMainWindow):
         self.statusBar().showMessage("Text translated (mock)")
     
     def start_flashcard_practice(self):
+        self.end_quiz()
         self.flashcard_words = []
         cursor = self.db.conn.cursor()
         cursor.execute("SELECT word, definition FROM words ORDER BY RANDOM() LIMIT 10")
@@ -674,13 +2996,145 @@ class kiswaziDictionary(QMainWindow):
         else:
             self.update_flashcard()
     
+    def start_quiz(self):
+        length, ok = QInputDialog.getInt(self, 'Start Quiz', 'Number of questions:', 10, 1, 500)
+        if not ok:
+            return
+        
+        with perf.span('quiz.generate'):
+            self.quiz_questions = self.quiz_generator.generate(length)
+        if not self.quiz_questions:
+            QMessageBox.information(self, "Quiz", f"At least {QuizGenerator.OPTIONS} words with definitions are needed for a quiz.")
+            return
+        
+        self.quiz_session = datetime.now().isoformat(timespec='seconds')
+        self.quiz_index = 0
+        self.quiz_score = 0
+        self.quiz_active = True
+        self.flip_btn.setEnabled(False)
+        self.next_btn.setEnabled(False)
+        self.quiz_panel.setVisible(True)
+        self.start_quiz_btn.setText("Restart Quiz")
+        self.show_quiz_question()
+    
+    def show_quiz_question(self):
+        word_id, word, options = self.quiz_questions[self.quiz_index]
+        self.flashcard_word.setText(word)
+        self.flashcard_definition.setText(
+            f"Question {self.quiz_index + 1} of {len(self.quiz_questions)} - Score: {self.quiz_score}")
+        for index, option_btn in enumerate(self.quiz_option_btns):
+            option_btn.setStyleSheet("")
+            if index < len(options):
+                definition = options[index][1]
+                option_btn.setText(definition if len(definition) <= 90 else definition[:87] + "...")
+                option_btn.setToolTip(definition)
+                option_btn.setEnabled(True)
+                option_btn.setVisible(True)
+            else:
+                option_btn.setVisible(False)
+        self.quiz_question_shown = time.perf_counter()
+    
+    def answer_quiz_question(self, index):
+        elapsed_ms = (time.perf_counter() - self.quiz_question_shown) * 1000
+        word_id, word, options = self.quiz_questions[self.quiz_index]
+        chosen_word_id = options[index][0]
+        self.quiz_answers.record(self.quiz_session, word_id, chosen_word_id, elapsed_ms)
+        if chosen_word_id == word_id:
+            self.quiz_score += 1
+        
+        for option_index, option_btn in enumerate(self.quiz_option_btns):
+            option_btn.setEnabled(False)
+            if option_index < len(options) and options[option_index][0] == word_id:
+                option_btn.setStyleSheet("background-color: #27ae60;")
+            elif option_index == index:
+                option_btn.setStyleSheet("background-color: #e74c3c;")
+        
+        QTimer.singleShot(800, self.next_quiz_question)
+    
+    def next_quiz_question(self):
+        if not self.quiz_active:
+            return
+        self.quiz_index += 1
+        if self.quiz_index < len(self.quiz_questions):
+            self.show_quiz_question()
+            return
+        
+        total = len(self.quiz_questions)
+        self.end_quiz()
+        self.flashcard_word.setText("Quiz Complete!")
+        self.flashcard_definition.setText(f"You scored {self.quiz_score} out of {total}")
+    
+    def end_quiz(self):
+        self.quiz_active = False
+        self.quiz_answers.flush()
+        self.quiz_panel.setVisible(False)
+    
+    def open_reader_file(self):
+        filename, _ = QFileDialog.getOpenFileName(self, 'Open Text', '', 'Text Files (*.txt);;All Files (*)')
+        if filename:
+            try:
+                with open(filename, 'r', encoding='utf-8', errors='replace') as f:
+                    self.reader_input.setPlainText(f.read())
+            except OSError as e:
+                QMessageBox.critical(self, "Open Error", f"Failed to open file: {str(e)}")
+                return
+            self.analyze_reader_text()
+    
+    def analyze_reader_text(self):
+        text = self.reader_input.toPlainText()
+        if not text.strip():
+            return
+        
+        with perf.span('reader.lookup'):
+            analysis = ReaderAnalysis(self.db.conn, text).run()
+        stats = analysis.stats()
+        self.reader_stats.setText(
+            f"{stats['tokens']} words ({stats['distinct']} distinct) - "
+            f"coverage {stats['token_coverage']:.1%} of running words, "
+            f"{stats['type_coverage']:.1%} of distinct words - "
+            f"{stats['distinct'] - stats['known_distinct']} unknown, {stats['bookmarked']} bookmarked")
+        
+        self.reader_unknown_list.clear()
+        for count, token in stats['top_unknown']:
+            item = QListWidgetItem(f"{token} ({count})")
+            item.setData(Qt.UserRole, token)
+            self.reader_unknown_list.addItem(item)
+        
+        # Render in pieces from the event loop so long texts appear progressively
+        self.reader_output.clear()
+        self.reader_output.entries = analysis.entries
+        self.reader_chunks = analysis.html_chunks()
+        self.render_reader_chunk()
+    
+    def render_reader_chunk(self):
+        if self.reader_chunks is None:
+            return
+        chunk = next(self.reader_chunks, None)
+        if chunk is None:
+            self.reader_chunks = None
+            return
+        with perf.span('reader.render_chunk'):
+            cursor = self.reader_output.textCursor()
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertHtml(chunk)
+        QTimer.singleShot(0, self.render_reader_chunk)
+    
+    def handle_forwarded_message(self, message):
+        self.restore_from_tray()
+        query = (message.get('query') or '').strip()
+        if query:
+            self.lookup_word(query)
+    
+    def lookup_word(self, word):
+        self.search_mode.setCurrentIndex(0)
+        self.search_input.setText(word)
+        self.search_word()
+    
     def add_word_list(self):
         name, ok = QInputDialog.getText(self, 'New Word List', 'Enter list name:')
         if ok and name:
             self.word_lists.addItem(name)
-            cursor = self.db.conn.cursor()
-            cursor.execute("INSERT INTO word_lists (list_name, words) VALUES (?, ?)", (name, ""))
-            self.db.conn.commit()
+            self.db.save_word_list(name, "")
     
     def check_grammar(self):
         text = self.grammar_input.toPlainText()
@@ -704,16 +3158,20 @@ class kiswaziDictionary(QMainWindow):
             self.grammar_results.setText("hakuna grammar issues detected!")
     
     def load_search_history(self):
-        self.history_list.clear()
-        cursor = self.db.conn.cursor()
-        cursor.execute("SELECT word, timestamp FROM search_history ORDER BY timestamp DESC LIMIT 50")
-        for word, timestamp in cursor.fetchall():
-            self.history_list.addItem(f"{word} - {timestamp}")
+        with perf.span('history.load'):
+            self.history_list.clear()
+            cursor = self.db.conn.cursor()
+            cursor.execute("SELECT word, timestamp FROM search_history ORDER BY timestamp DESC LIMIT 50")
+            for word, timestamp in cursor.fetchall():
+                self.history_list.addItem(f"{word} - {timestamp}")
+            
+            self.bookmarks_list.clear()
+            cursor.execute("SELECT word FROM bookmarks ORDER BY word")
+            for (word,) in cursor.fetchall():
+                self.bookmarks_list.addItem(word)
     
     def clear_search_history(self):
-        cursor = self.db.conn.cursor()
-        cursor.execute("DELETE FROM search_history")
-        self.db.conn.commit()
+        self.db.clear_history()
         self.load_search_history()
         self.statusBar().showMessage("Search history cleared")
     
@@ -844,28 +3302,29 @@ class kiswaziDictionary(QMainWindow):
         filename, _ = QFileDialog.getSaveFileName(self, 'Export Data', 'dictionary_data.json', 'JSON Files (*.json)')
         if filename:
             try:
-                data = {
-                    'search_history': [],
-                    'bookmarks': [],
-                    'word_lists': []
-                }
-                
-                cursor = self.db.conn.cursor()
-                
-                # Export search history
-                cursor.execute("SELECT word, timestamp FROM search_history")
-                data['search_history'] = [{'word': row[0], 'timestamp': row[1]} for row in cursor.fetchall()]
-                
-                # Export bookmarks
-                cursor.execute("SELECT word, timestamp FROM bookmarks")
-                data['bookmarks'] = [{'word': row[0], 'timestamp': row[1]} for row in cursor.fetchall()]
-                
-                # Export word lists
-                cursor.execute("SELECT list_name, words, created_date FROM word_lists")
-                data['word_lists'] = [{'name': row[0], 'words': row[1], 'created_date': row[2]} for row in cursor.fetchall()]
-                
-                with open(filename, 'w') as f:
-                    json.dump(data, f, indent=2)
+                with perf.span('data.export'):
+                    data = {
+                        'search_history': [],
+                        'bookmarks': [],
+                        'word_lists': []
+                    }
+                    
+                    cursor = self.db.conn.cursor()
+                    
+                    # Export search history
+                    cursor.execute("SELECT word, timestamp, uid FROM search_history")
+                    data['search_history'] = [{'word': row[0], 'timestamp': row[1], 'uid': row[2]} for row in cursor.fetchall()]
+                    
+                    # Export bookmarks
+                    cursor.execute("SELECT word, timestamp FROM bookmarks")
+                    data['bookmarks'] = [{'word': row[0], 'timestamp': row[1]} for row in cursor.fetchall()]
+                    
+                    # Export word lists
+                    cursor.execute("SELECT list_name, words, created_date FROM word_lists")
+                    data['word_lists'] = [{'name': row[0], 'words': row[1], 'created_date': row[2]} for row in cursor.fetchall()]
+                    
+                    with open(filename, 'w') as f:
+                        json.dump(data, f, indent=2)
                 
                 QMessageBox.information(self, "Export Complete", f"Data exported to {filename}")
             except Exception as e:
@@ -875,33 +3334,268 @@ class kiswaziDictionary(QMainWindow):
         filename, _ = QFileDialog.getOpenFileName(self, 'Import Data', '', 'JSON Files (*.json)')
         if filename:
             try:
-                with open(filename, 'r') as f:
-                    data = json.load(f)
-                
-                cursor = self.db.conn.cursor()
-                
-                # histor ya kisearch
-                for item in data.get('search_history', []):
-                    cursor.execute("INSERT OR IGNORE INTO search_history (word, timestamp) VALUES (?, ?)",
-                                 (item['word'], item['timestamp']))
-                
-                # Import bookmarks
-                for item in data.get('bookmarks', []):
-                    cursor.execute("INSERT OR IGNORE INTO bookmarks (word, timestamp) VALUES (?, ?)",
-                                 (item['word'], item['timestamp']))
-                
-                # Import word lists
-                for item in data.get('word_lists', []):
-                    cursor.execute("INSERT OR IGNORE INTO word_lists (list_name, words, created_date) VALUES (?, ?, ?)",
-                                 (item['name'], item['words'], item['created_date']))
-                
-                self.db.conn.commit()
+                with perf.span('data.import'):
+                    with open(filename, 'r') as f:
+                        data = json.load(f)
+                    
+                    cursor = self.db.conn.cursor()
+                    
+                    # histor ya kisearch; entries already present (same uid, or the
+                    # same word and time for files without uids) are skipped
+                    for item in data.get('search_history', []):
+                        if item.get('uid'):
+                            cursor.execute("SELECT 1 FROM search_history WHERE uid = ?", (item['uid'],))
+                        else:
+                            cursor.execute("SELECT 1 FROM search_history WHERE word = ? AND timestamp = ?",
+                                         (item['word'], item['timestamp']))
+                        if cursor.fetchone() is None:
+                            self.db.sync.record('search_history', item.get('uid'), 'insert',
+                                                {'word': item['word'], 'timestamp': item['timestamp']})
+                    
+                    # Import bookmarks
+                    for item in data.get('bookmarks', []):
+                        if not self.db.is_bookmarked(item['word']):
+                            self.db.sync.record('bookmarks', item['word'], 'upsert', {'timestamp': item['timestamp']})
+                    
+                    # Import word lists
+                    for item in data.get('word_lists', []):
+                        cursor.execute("SELECT 1 FROM word_lists WHERE list_name = ?", (item['name'],))
+                        if cursor.fetchone() is None:
+                            self.db.sync.record('word_lists', item['name'], 'upsert',
+                                                {'words': item['words'], 'created_date': item['created_date']})
+                    
+                    self.db.conn.commit()
                 self.load_search_history()
                 
                 QMessageBox.information(self, "Import Complete", "Data imported successfully")
             except Exception as e:
                 QMessageBox.critical(self, "Import Error", f"Failed to import data: {str(e)}")
     
+    def load_dictionary_sources(self):
+        self.sources_list.blockSignals(True)
+        self.sources_list.clear()
+        for source in self.db.federation.sources:
+            label = source.name if source.source_id is None else f"{source.name} ({source.path})"
+            item = QListWidgetItem(label)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if source.enabled else Qt.Unchecked)
+            item.setData(Qt.UserRole, source)
+            self.sources_list.addItem(item)
+        self.sources_list.blockSignals(False)
+    
+    def toggle_dictionary_source(self, item):
+        source = item.data(Qt.UserRole)
+        self.db.federation.set_enabled(source, item.checkState() == Qt.Checked)
+    
+    def add_dictionary_source(self):
+        path, _ = QFileDialog.getOpenFileName(self, 'Add Dictionary', '', 'SQLite Databases (*.db *.sqlite);;All Files (*)')
+        if not path:
+            return
+        name, ok = QInputDialog.getText(self, 'Add Dictionary', 'Dictionary name:',
+                                        text=os.path.splitext(os.path.basename(path))[0])
+        if not ok or not name:
+            return
+        try:
+            self.db.federation.add_source(name, path)
+        except (sqlite3.Error, OSError) as e:
+            QMessageBox.critical(self, "Dictionary Error", f"Could not add dictionary: {str(e)}")
+            return
+        self.load_dictionary_sources()
+        self.statusBar().showMessage(f"Added dictionary '{name}'")
+    
+    def remove_dictionary_source(self):
+        item = self.sources_list.currentItem()
+        if not item:
+            return
+        source = item.data(Qt.UserRole)
+        if source.source_id is None:
+            QMessageBox.information(self, "Dictionaries", "The main dictionary can be disabled but not removed.")
+            return
+        self.db.federation.remove_source(source)
+        self.load_dictionary_sources()
+    
+    def toggle_clipboard_lookup(self, enabled):
+        if self.tray_icon is not None and self.tray_clipboard_action.isChecked() != enabled:
+            self.tray_clipboard_action.setChecked(enabled)
+        if enabled:
+            self.hot_index.start_loading()
+        else:
+            self.clipboard_popup.hide()
+    
+    def on_clipboard_changed(self):
+        if not self.clipboard_lookup_check.isChecked():
+            return
+        # Only while the app is out of the way; in the window the search box is there
+        if self.isVisible() and not self.isMinimized():
+            return
+        text = QApplication.clipboard().text().strip()
+        if not text or len(text) > 50 or len(text.split()) > 3:
+            return
+        
+        self.hot_index.check_for_changes()
+        entry = self.hot_index.lookup(text)
+        if entry:
+            self.clipboard_popup.show_entry(entry)
+    
+    def on_tray_activated(self, reason):
+        if reason in (QSystemTrayIcon.Trigger, QSystemTrayIcon.DoubleClick):
+            self.restore_from_tray()
+    
+    def restore_from_tray(self):
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+    
+    def changeEvent(self, event):
+        # With clipboard lookup on, minimizing hides the window into the tray
+        if (event.type() == QEvent.WindowStateChange and self.isMinimized()
+                and self.tray_icon is not None and self.clipboard_lookup_check.isChecked()):
+            QTimer.singleShot(0, self.hide)
+        super().changeEvent(event)
+    
+    def toggle_diagnostics_panel(self):
+        visible = not self.diagnostics_group.isVisible()
+        self.diagnostics_group.setVisible(visible)
+        if visible:
+            self.tab_widget.setCurrentIndex(self.tab_widget.count() - 1)
+            self.refresh_diagnostics()
+    
+    def toggle_diagnostics(self, enabled):
+        perf.enabled = enabled
+        self.statusBar().showMessage("Performance recording " + ("enabled" if enabled else "disabled"))
+    
+    def refresh_diagnostics(self):
+        stats = perf.stats()
+        self.diagnostics_table.setRowCount(len(stats))
+        for row, name in enumerate(sorted(stats)):
+            entry = stats[name]
+            values = [name, str(entry['count'])] + [f"{entry[key]:.2f}" for key in ('p50', 'p95', 'p99', 'max')]
+            for column, value in enumerate(values):
+                self.diagnostics_table.setItem(row, column, QTableWidgetItem(value))
+        
+        counters = ", ".join(f"{name}: {value}" for name, value in sorted(perf.counters.items()))
+        self.diagnostics_counters.setText(f"Counters: {counters}" if counters else "No counters recorded")
+    
+    def save_trace(self):
+        filename, _ = QFileDialog.getSaveFileName(self, 'Save Trace', 'kiswazi_trace.json', 'JSON Files (*.json)')
+        if filename:
+            try:
+                count = perf.dump_chrome_trace(filename)
+                self.statusBar().showMessage(f"Saved {count} trace event(s) to {filename}")
+            except Exception as e:
+                QMessageBox.critical(self, "Trace Error", f"Failed to save trace: {str(e)}")
+    
+    def clear_diagnostics(self):
+        perf.clear()
+        self.refresh_diagnostics()
+    
+    def update_sync_label(self):
+        folder = self.db.sync.folder
+        self.sync_folder_label.setText(f"Sync folder: {folder}" if folder else "Sync folder: not set")
+    
+    def choose_sync_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, 'Choose Sync Folder', self.db.sync.folder or '')
+        if folder:
+            self.db.sync.set_folder(folder)
+            self.update_sync_label()
+            self.sync_personal_data()
+    
+    def sync_personal_data(self, quiet=False):
+        if not self.db.sync.folder:
+            if not quiet:
+                QMessageBox.information(self, "Sync", "Choose a sync folder first.")
+            return
+        try:
+            with perf.span('data.sync'):
+                sent, received = self.db.sync.sync()
+        except Exception as e:
+            if quiet:
+                self.statusBar().showMessage(f"Sync failed: {str(e)}")
+            else:
+                QMessageBox.critical(self, "Sync Error", f"Failed to sync: {str(e)}")
+            return
+        if received:
+            self.load_search_history()
+        message = f"Sync complete: sent {sent}, received {received} change(s)"
+        if self.db.sync.skipped:
+            message += f", skipped {self.db.sync.skipped} unreadable line(s)"
+        self.statusBar().showMessage(message)
+    
+    def import_words(self):
+        filename, _ = QFileDialog.getOpenFileName(self, 'Import Words', '', 'CSV Files (*.csv)')
+        if filename:
+            try:
+                with perf.span('data.import_words'):
+                    # First row is a header naming the columns; only "word" is required
+                    with open(filename, newline='', encoding='utf-8') as f:
+                        reader = csv.DictReader(f)
+                        fields = ('word', 'definition', 'part_of_speech', 'pronunciation',
+                                  'etymology', 'example', 'synonyms', 'antonyms')
+                        rows = [tuple(row.get(field) or '' for field in fields)
+                                for row in reader if (row.get('word') or '').strip()]
+                    imported = self.db.import_words(rows)
+                
+                QMessageBox.information(self, "Import Complete", f"Imported {imported} new word(s)")
+            except Exception as e:
+                QMessageBox.critical(self, "Import Error", f"Failed to import words: {str(e)}")
+    
+    def run_maintenance(self):
+        if self.maintenance_thread is not None and self.maintenance_thread.is_alive():
+            return
+        self.maintenance_thread = threading.Thread(target=self._maintenance_worker,
+                                                   name='db-maintenance', daemon=True)
+        self.maintenance_thread.start()
+    
+    def _maintenance_worker(self):
+        # Runs on the maintenance thread with its own connection; the outcome
+        # reaches the GUI thread through a queued signal
+        problems, error = [], ''
+        try:
+            with perf.span('db.maintenance'):
+                problems = self.db.run_maintenance()
+        except sqlite3.Error as e:
+            error = str(e)
+        finally:
+            self.db.connections.release()
+        self.maintenance_finished.emit(problems, error)
+    
+    def on_maintenance_finished(self, problems, error):
+        if problems or error:
+            self.report_integrity_problems(problems or [error])
+    
+    def report_integrity_problems(self, problems):
+        details = "\n".join(problems[:10])
+        QMessageBox.warning(self, "Database Problem",
+                            f"The dictionary database at {self.db.db_path} failed its integrity check. "
+                            f"Export your personal data and restore from a backup.\n\n{details}")
+    
+    def generate_pronunciations(self):
+        enricher = PronunciationEnricher(self.db.db_path)
+        pending = enricher.pending_count()
+        if not pending:
+            self.statusBar().showMessage("All words already have pronunciations")
+            return
+        
+        progress = QProgressDialog("Generating pronunciations...", "Stop", 0, pending, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        
+        def on_progress(processed):
+            progress.setValue(min(processed, pending))
+            QApplication.processEvents()
+            if progress.wasCanceled():
+                enricher.cancelled = True
+        
+        try:
+            updated = enricher.run(on_progress)
+        except Exception as e:
+            QMessageBox.critical(self, "Pronunciation Error", f"Failed to generate pronunciations: {str(e)}")
+            return
+        finally:
+            progress.close()
+        
+        self.statusBar().showMessage(f"Added pronunciations to {updated} word(s)")
+    
     def load_settings(self):
         cursor = self.db.conn.cursor()
         cursor.execute("SELECT key, value FROM settings")
@@ -915,18 +3609,95 @@ class kiswaziDictionary(QMainWindow):
             self.dark_mode_check.setChecked(True)
         else:
             self.dark_mode = False
+        
+        if settings.get('diagnostics_enabled') == 'true':
+            self.diagnostics_check.setChecked(True)
+        
+        if settings.get('clipboard_lookup') == 'true':
+            self.clipboard_lookup_check.setChecked(True)
     
     def save_settings(self):
         cursor = self.db.conn.cursor()
         cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
                       ('dark_mode', 'true' if self.dark_mode else 'false'))
+        cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                      ('diagnostics_enabled', 'true' if self.diagnostics_check.isChecked() else 'false'))
+        cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                      ('clipboard_lookup', 'true' if self.clipboard_lookup_check.isChecked() else 'false'))
         self.db.conn.commit()
     
     def closeEvent(self, event):
         self.save_settings()
-        self.db.conn.close()
+        self.sync_personal_data(quiet=True)
+        self.quiz_answers.flush()
+        self.clipboard_popup.close()
+        if self.tray_icon is not None:
+            self.tray_icon.hide()
+        self.hot_index.close()
+        self.db.close()
         event.accept()
 
+class SingleInstance(QObject):
+    # Keeps one running app per user and database. A second launch hands its
+    # command line to the first over a QLocalServer socket and exits.
+    message_received = pyqtSignal(dict)
+    
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        key = hashlib.blake2b(os.path.abspath(db_path).encode('utf-8'), digest_size=6).hexdigest()
+        self.server_name = f"kiswazi-dictionary-{getpass.getuser()}-{key}"
+        self.server = None
+    
+    def forward(self, message, timeout_ms=500):
+        # Returns True when another instance accepted the message
+        socket = QLocalSocket()
+        socket.connectToServer(self.server_name)
+        if not socket.waitForConnected(timeout_ms):
+            return False
+        socket.write(json.dumps(message).encode('utf-8') + b'\n')
+        socket.flush()
+        socket.waitForBytesWritten(timeout_ms)
+        socket.disconnectFromServer()
+        return True
+    
+    def listen(self, message):
+        # Returns False when another instance turned out to be running and took
+        # the message, in which case this launch should exit
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self.accept_connection)
+        if self.server.listen(self.server_name):
+            return True
+        if self.server.serverError() != QAbstractSocket.AddressInUseError:
+            # Cannot listen at all; run without single-instance forwarding
+            return True
+        # Either a launch racing this one got there first, or a crashed instance
+        # left its socket file behind. Only a socket nobody answers is stale.
+        if self.forward(message):
+            return False
+        QLocalServer.removeServer(self.server_name)
+        if self.server.listen(self.server_name):
+            return True
+        # Lost the race for the freed name to another new launch
+        return not self.forward(message)
+    
+    def accept_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.setProperty('buffer', b'')
+            socket.readyRead.connect(lambda s=socket: self.read_message(s))
+            socket.disconnected.connect(socket.deleteLater)
+    
+    def read_message(self, socket):
+        data = socket.property('buffer') + bytes(socket.readAll())
+        while b'\n' in data:
+            line, data = data.split(b'\n', 1)
+            try:
+                self.message_received.emit(json.loads(line))
+            except ValueError:
+                pass
+        socket.setProperty('buffer', data)
+
+
 class SplashScreen(QSplashScreen):
     def __init__(self):
         super().__init__()
@@ -950,19 +3721,35 @@ def main():
     app.setApplicationName("kiswazi Dictionary")
     app.setApplicationVersion("1.0")
     
-    # Show splash screen
-    splash = SplashScreen()
-    splash.show()
+    # Anything after the program name is a word to look up, e.g. `app.py jambo`
+    query = ' '.join(app.arguments()[1:]).strip()
+    db_path = os.environ.get('KISWAZI_DB') or DEFAULT_DB_PATH
     
-    # Process events to show splash
-    app.processEvents()
+    # Hand the query to an already running instance instead of starting another
+    instance = SingleInstance(db_path)
+    if instance.forward({'query': query}) or not instance.listen({'query': query}):
+        return
+    
+    # Show splash screen
+    with perf.span('startup.splash'):
+        splash = SplashScreen()
+        splash.show()
+        
+        # Process events to show splash
+        app.processEvents()
     
     # Load main window
-    window = kiswaziDictionary()
+    with perf.span('startup.window'):
+        window = kiswaziDictionary(db_path)
+    instance.message_received.connect(window.handle_forwarded_message)
     
     # Close splash and show main window
-    splash.finish(window)
-    window.show()
+    with perf.span('startup.show'):
+        splash.finish(window)
+        window.show()
+    
+    if query:
+        window.lookup_word(query)
     
     sys.exit(app.exec_())
 